@@ -1,18 +1,24 @@
 import requests
+import sys
+from pathlib import Path
 from capture import record
 from features import extract
 from anomaly import detect
 from time import sleep, time
 import logging
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from event_client import EventClient
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-BACKEND_URL = "http://localhost:8000/events"
+BACKEND_URL = "http://localhost:8000"
 
 def run_audio_loop():
     logger.info("Audio Module Started")
+    client = EventClient(BACKEND_URL, name="audio")
     
     # Fetch active session ID
     session_id = 1
@@ -38,12 +44,8 @@ def run_audio_loop():
                     "confidence": event["confidence"],
                     "timestamp": time()
                 }
-                try:
-                    response = requests.post(BACKEND_URL, json=event_data, timeout=5)
-                    response.raise_for_status()
-                    logger.debug(f"Event posted: {event['type']} ({event['confidence']:.2f})")
-                except requests.RequestException as e:
-                    logger.error(f"Failed to post event: {e}")
+                client.send(event_data)
+                logger.debug(f"Event queued: {event['type']} ({event['confidence']:.2f})")
             sleep(1)
         except Exception as e:
             logger.error(f"Error in audio loop: {e}")
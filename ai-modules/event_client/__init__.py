@@ -0,0 +1,4 @@
+from .client import EventClient
+from .spool import Spool
+
+__all__ = ["EventClient", "Spool"]
@@ -0,0 +1,202 @@
+import queue
+import random
+import sys
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .spool import Spool
+
+logger = logging.getLogger(__name__)
+
+# Payload validation failures; resending the same batch cannot succeed
+REJECTED_STATUSES = (400, 422)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class EventClient:
+    """
+    Background event sender shared by the AI modules.
+
+    Detection loops call send(), which only enqueues. A sender thread batches
+    events by size and time, posts them to /events/batch over a keep-alive
+    connection pool, retries with jittered exponential backoff and spools
+    batches to disk while the backend is unreachable, replaying them once it
+    answers again.
+
+    Args:
+        base_url: Backend root URL
+        name: Module name, used for the spool file and thread name
+        batch_size: Maximum events per request
+        flush_interval: Maximum seconds an event waits before being sent
+        max_queue: In-memory queue bound; the oldest event is dropped when full
+        spool_path: Spool file (default "<name>_events.spool" in the working dir)
+        wire_format: "json" or "binary" (backend/event_codec.py)
+        observe: Optional callback given the duration in seconds of each POST
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        name: str = "events",
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+        timeout: float = 2.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        spool_path: Optional[str] = None,
+        wire_format: str = "json",
+        observe: Optional[Callable[[float], None]] = None,
+    ):
+        self.url = base_url.rstrip("/") + "/events/batch"
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.spool = Spool(spool_path or f"{name}_events.spool")
+        self.stats = {"sent": 0, "spooled": 0, "replayed": 0, "failures": 0, "dropped": 0, "rejected": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._encode = None
+        if wire_format == "binary":
+            if str(PROJECT_ROOT) not in sys.path:
+                sys.path.insert(0, str(PROJECT_ROOT))
+            from backend.event_codec import CONTENT_TYPE, encode_events
+            self._encode = encode_events
+            self.session.headers["Content-Type"] = CONTENT_TYPE
+
+        self.observe = observe
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{name}-event-sender", daemon=True)
+        self._thread.start()
+
+    def send(self, event: dict) -> None:
+        """Enqueue an event without blocking"""
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                # Sender cannot keep up even by spooling; drop the oldest event
+                try:
+                    self.queue.get_nowait()
+                    self.stats["dropped"] += 1
+                except queue.Empty:
+                    pass
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the sender, flushing queued events (to the spool if undeliverable)"""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _post(self, batch: List[dict]) -> bool:
+        start = time.perf_counter()
+        try:
+            if self._encode is not None:
+                resp = self.session.post(self.url, data=self._encode(batch), timeout=self.timeout)
+            else:
+                resp = self.session.post(self.url, json=batch, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.warning(f"Event post failed: {e}")
+            return False
+        finally:
+            if self.observe is not None:
+                self.observe(time.perf_counter() - start)
+        if resp.status_code in REJECTED_STATUSES:
+            # Rejected by validation; retrying will not help
+            self.stats["rejected"] += len(batch)
+            logger.error(f"Backend rejected {len(batch)} events: HTTP {resp.status_code} {resp.text[:200]}")
+            return True
+        if not resp.ok:
+            # Storage outage, auth, rate limit...: keep the batch for a retry
+            logger.warning(f"Event post failed: HTTP {resp.status_code}")
+            return False
+        return True
+
+    def _backoff(self) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self._failures))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _collect(self) -> List[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch: List[dict]) -> None:
+        if time.monotonic() < self._retry_at:
+            # Backend is down: keep memory bounded by spooling until the retry time
+            self.spool.append(batch)
+            self.stats["spooled"] += len(batch)
+            return
+
+        if self.spool.pending():
+            # Preserve order: older spooled events go first
+            self.spool.append(batch)
+            self.stats["spooled"] += len(batch)
+            batch = []
+            replayed = self.spool.replay(self._post, self.batch_size)
+            self.stats["replayed"] += replayed
+            ok = not self.spool.pending()
+        else:
+            ok = not batch or self._post(batch)
+            if ok:
+                self.stats["sent"] += len(batch)
+
+        if ok:
+            if self._failures:
+                logger.info("Backend reachable again")
+            self._failures = 0
+            self._retry_at = 0.0
+            return
+
+        if batch:
+            self.spool.append(batch)
+            self.stats["spooled"] += len(batch)
+        self.stats["failures"] += 1
+        delay = self._backoff()
+        self._failures += 1
+        self._retry_at = time.monotonic() + delay
+        logger.warning(f"Backend unavailable, spooling events and retrying in {delay:.1f}s")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch or (self.spool.pending() and time.monotonic() >= self._retry_at):
+                self._deliver(batch)
+
+        # Final flush
+        remaining = []
+        while True:
+            try:
+                remaining.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        for i in range(0, len(remaining), self.batch_size):
+            chunk = remaining[i:i + self.batch_size]
+            if not self._post(chunk):
+                self.spool.append(remaining[i:])
+                break
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import logging
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class Spool:
+    """
+    Append-only JSON-lines file holding events the backend did not accept.
+
+    Replay position is kept in a sidecar ".offset" file so a restart resumes
+    where it stopped. Delivery is at-least-once: a crash between a successful
+    post and the offset update re-sends that batch.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset_path = path + ".offset"
+        self._lock = threading.Lock()
+
+    def append(self, events: List[dict]):
+        if not events:
+            return
+        data = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int):
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, self.offset_path)
+
+    def pending(self) -> bool:
+        try:
+            return os.path.getsize(self.path) > self._read_offset()
+        except OSError:
+            return False
+
+    def replay(self, post: Callable[[List[dict]], bool], batch_size: int) -> int:
+        """
+        Post spooled events in batches until the file is drained or a post fails.
+
+        Returns:
+            Number of events replayed
+        """
+        replayed = 0
+        offset = self._read_offset()
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except OSError:
+            return 0
+        with f:
+            f.seek(offset)
+            while True:
+                batch = []
+                for line in iter(f.readline, ""):
+                    if not line.endswith("\n"):
+                        break  # partial trailing write, retry later
+                    try:
+                        batch.append(json.loads(line))
+                    except ValueError:
+                        logger.warning("Skipping corrupt spool line")
+                    offset = f.tell()
+                    if len(batch) >= batch_size:
+                        break
+                if not batch:
+                    break
+                if not post(batch):
+                    return replayed
+                replayed += len(batch)
+                self._write_offset(offset)
+
+        with self._lock:
+            # Drained: start a fresh file unless new events were appended meanwhile
+            if os.path.getsize(self.path) == offset:
+                os.remove(self.path)
+                if os.path.exists(self.offset_path):
+                    os.remove(self.offset_path)
+        return replayed
@@ -0,0 +1,131 @@
+import threading
+import time
+import logging
+from typing import NamedTuple, Optional
+import cv2
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+
+
+class StreamTier(NamedTuple):
+    """Preview quality profile: downscale width (None = native), JPEG quality, fps cap"""
+    width: Optional[int]
+    quality: int
+    max_fps: float
+
+
+TIERS = {
+    "thumbnail": StreamTier(width=160, quality=50, max_fps=5),
+    "standard": StreamTier(width=320, quality=70, max_fps=10),
+    "full": StreamTier(width=None, quality=85, max_fps=15),
+}
+DEFAULT_TIER = "full"
+
+
+def multipart(jpeg):
+    """Wrap JPEG bytes as one part of a multipart/x-mixed-replace stream"""
+    return BOUNDARY + jpeg + b"\r\n"
+
+
+class FrameBroadcaster:
+    """
+    Fan-out of one camera's annotated frames to any number of MJPEG clients.
+
+    publish() only swaps the frame reference, bumps a sequence number and
+    wakes waiting clients, so the detection loop never pays for encoding.
+    Each sequence is downscaled and JPEG-encoded once per tier, by whichever
+    client of that tier asks for it first; every other client of the tier
+    reuses the cached bytes. Streaming CPU therefore scales with the frame
+    rate and the number of tiers in use, not the number of viewers.
+
+    Args:
+        tiers: Mapping of tier name to StreamTier
+    """
+
+    def __init__(self, tiers=TIERS):
+        self.tiers = tiers
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        # Per-tier locks and caches so encoding never blocks publish() or
+        # clients of another tier
+        self._encode_locks = {name: threading.Lock() for name in tiers}
+        self._encoded = {name: (0, None) for name in tiers}
+        self.encodes = dict.fromkeys(tiers, 0)
+
+    def publish(self, frame):
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def latest(self):
+        with self._cond:
+            return self._frame
+
+    def wait(self, after_seq, timeout=1.0):
+        """
+        Block until a frame newer than after_seq is published.
+
+        Returns:
+            (seq, frame), or (after_seq, None) on timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after_seq, timeout):
+                return after_seq, None
+            return self._seq, self._frame
+
+    def jpeg(self, seq, frame, tier=DEFAULT_TIER):
+        """
+        JPEG bytes of frame seq for a tier, encoding only if no client has yet.
+
+        Returns:
+            (seq, bytes) of the newest encode at or after seq, or (seq, None)
+            if encoding failed
+        """
+        with self._encode_locks[tier]:
+            encoded_seq, data = self._encoded[tier]
+            if encoded_seq >= seq:
+                return encoded_seq, data
+            width, quality, _ = self.tiers[tier]
+            with metrics.timer(f"jpeg_encode_{tier}"):
+                if width and frame.shape[1] > width:
+                    height = round(frame.shape[0] * width / frame.shape[1])
+                    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                return seq, None
+            self._encoded[tier] = (seq, buf.tobytes())
+            self.encodes[tier] += 1
+            return self._encoded[tier]
+
+    def stream(self, tier=DEFAULT_TIER, max_fps=None, active=lambda: True):
+        """
+        Generate multipart JPEG parts for one client of a tier.
+
+        Frames are paced to max_fps, clamped to the tier's cap. Waits on the
+        condition variable for the next sequence instead of polling, and
+        skips any frames published while the client was paced.
+        """
+        cap = self.tiers[tier].max_fps
+        interval = 1.0 / min(max_fps or cap, cap)
+        seq = 0
+        next_at = 0.0
+        while True:
+            if not active():
+                time.sleep(0.5)
+                continue
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            latest, frame = self.wait(seq)
+            if frame is None:
+                continue
+            seq, data = self.jpeg(latest, frame, tier)
+            if data is None:
+                continue
+            next_at = time.monotonic() + interval
+            yield multipart(data)
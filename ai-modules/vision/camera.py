@@ -1,38 +1,180 @@
+import os
+import sys
+import threading
+import time
 import cv2
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def platform_backend():
+    """Native capture API for local devices on this platform"""
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    if sys.platform == "win32":
+        return cv2.CAP_DSHOW
+    if sys.platform == "darwin":
+        return cv2.CAP_AVFOUNDATION
+    return cv2.CAP_ANY
+
+
 class Camera:
-    def __init__(self, source=0):
+    """
+    Camera, stream or video file capture.
+
+    Live sources (device indices and stream URLs) are drained by a background
+    grab thread that keeps only the newest frame and its capture time, so
+    read() never returns frames that sat in OpenCV's or the driver's buffer.
+    Video files are read synchronously, frame by frame.
+
+    Args:
+        source: Device index, stream URL or video file path
+        width, height, fps: Requested capture format; the device may
+            negotiate something else, which is logged
+        fourcc: Requested pixel format, e.g. "MJPG" (lets USB cameras deliver
+            640x480 at 30 fps over USB 2 bandwidth); None keeps the default
+        buffer_size: Driver buffer length (CAP_PROP_BUFFERSIZE); 1 minimises
+            latency on backends that honour it
+        threaded: Force the grab thread on or off (default: live sources only)
+    """
+
+    def __init__(self, source=0, width=640, height=480, fps=30, fourcc="MJPG", buffer_size=1, threaded=None):
         logger.info(f"Initializing camera with source: {source}")
-        self.cap = cv2.VideoCapture(source, cv2.CAP_DSHOW)  # Use DirectShow on Windows for better compatibility
-        
-        if not self.cap.isOpened():
-            logger.error(f"Failed to open camera source {source}")
-            # Try alternative backend
-            self.cap = cv2.VideoCapture(source)
+        self.source = source
+        is_file = isinstance(source, str) and os.path.exists(source)
+        if isinstance(source, int):
+            self.cap = cv2.VideoCapture(source, platform_backend())
             if not self.cap.isOpened():
-                logger.error("Failed to open camera with alternative backend")
+                logger.error(f"Failed to open camera source {source} with the platform backend")
+                # Try alternative backend
+                self.cap = cv2.VideoCapture(source)
         else:
-            # Set camera properties for better performance
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            logger.info("Camera initialized successfully")
+            self.cap = cv2.VideoCapture(source)
 
-    def read(self):
         if not self.cap.isOpened():
-            logger.warning("Camera is not opened")
-            return None
-            
+            logger.error(f"Failed to open camera source {source}")
+        elif not is_file:
+            self._configure(width, height, fps, fourcc, buffer_size)
+
+        self.timestamp = None
+        self._frame = None
+        self._seq = 0
+        self._read_seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        if self.cap.isOpened() and (not is_file if threaded is None else threaded):
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, name=f"grab-{source}", daemon=True)
+            self._thread.start()
+
+    def _configure(self, width, height, fps, fourcc, buffer_size):
+        # FOURCC must be set before the resolution for V4L2 to pick a mode that supports it
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        negotiated = "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)) if code else "default"
+        logger.info(
+            f"Camera initialized successfully: {int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x"
+            f"{int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))} @ {self.cap.get(cv2.CAP_PROP_FPS):.0f} fps, "
+            f"fourcc={negotiated}, backend={self.cap.getBackendName()}"
+        )
+
+    def _grab_loop(self):
+        failures = 0
+        while self._running:
+            ret, frame = self.cap.read()
+            now = time.monotonic()
+            if not ret:
+                failures += 1
+                if failures == 1:
+                    logger.warning("Failed to read frame from camera")
+                time.sleep(min(0.5, 0.01 * failures))
+                continue
+            failures = 0
+            with self._cond:
+                # Each read allocates a new array, so the previous frame is
+                # simply dropped rather than copied over
+                self._frame = frame
+                self.timestamp = now
+                self._seq += 1
+                self._cond.notify_all()
+
+    def read_latest(self, timeout=1.0):
+        """
+        Newest frame not returned before, with its capture time.
+
+        Returns:
+            (frame, time.monotonic() at capture), or (None, None) if no new
+            frame arrived within timeout
+        """
+        if self._thread is None:
+            frame = self._read_sync()
+            return frame, self.timestamp if frame is not None else None
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > self._read_seq or not self._running, timeout):
+                return None, None
+            if self._seq == self._read_seq:
+                return None, None
+            self._read_seq = self._seq
+            return self._frame, self.timestamp
+
+    def _read_sync(self):
         ret, frame = self.cap.read()
         if not ret:
             logger.warning("Failed to read frame from camera")
             return None
+        self.timestamp = time.monotonic()
+        return frame
+
+    def read(self, out=None):
+        """
+        Read the next frame; with out, place it in that array (e.g. a
+        shared-memory slot) and return it.
+
+        Only unthreaded captures decode straight into out. With the grab
+        thread the frame is decoded into its own array first and copied
+        into out, so zero-copy callers should pass threaded=False.
+        """
+        if not self.cap.isOpened():
+            logger.warning("Camera is not opened")
+            return None
+
+        if self._thread is None and out is not None:
+            # Synchronous reads can decode straight into the caller's buffer
+            ret, frame = self.cap.read(out)
+            if not ret:
+                logger.warning("Failed to read frame from camera")
+                return None
+            self.timestamp = time.monotonic()
+        else:
+            frame, _ = self.read_latest()
+            if frame is None:
+                return None
+        if out is not None and frame is not out:
+            if frame.shape == out.shape:
+                out[...] = frame
+            else:
+                cv2.resize(frame, (out.shape[1], out.shape[0]), dst=out)
+            return out
         return frame
 
     def release(self):
+        if self._thread is not None:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+            self._thread.join(timeout=2.0)
+            self._thread = None
         if self.cap.isOpened():
             self.cap.release()
             logger.info("Camera released")
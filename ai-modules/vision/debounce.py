@@ -0,0 +1,101 @@
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def event_key(event: dict) -> str:
+    """Identity of a detection across frames: type plus object/direction (and track id when present)"""
+    parts = [event["type"], str(event.get("object") or event.get("direction") or "")]
+    if event.get("track_id") is not None:
+        parts.append(str(event["track_id"]))
+    return ":".join(parts)
+
+
+class OpenEvent:
+    """A detection that is currently persisting"""
+
+    def __init__(self, event: dict, now: float):
+        self.event = event
+        self.start = now
+        self.last_seen = now
+        self.last_emit = now
+        self.count = 0
+        self.conf_sum = 0.0
+        self.peak = 0.0
+        self.observe(event, now)
+
+    def observe(self, event: dict, now: float):
+        self.last_seen = now
+        self.count += 1
+        self.conf_sum += event["confidence"]
+        self.peak = max(self.peak, event["confidence"])
+
+    def summary(self, suffix: str, now: float) -> dict:
+        end = self.last_seen if suffix == "_END" else now
+        return {
+            **self.event,
+            "type": self.event["type"] + suffix,
+            "confidence": round(self.conf_sum / self.count, 4),
+            "peak_confidence": round(self.peak, 4),
+            "duration": round(end - self.start, 3),
+        }
+
+
+class EventDebouncer:
+    """
+    Per-sensor event state machine. Turns a stream of per-frame detections into
+    one event when a detection starts and one "<TYPE>_END" event when it has not
+    been seen for end_after seconds. The end event carries the mean confidence
+    over the open period, the peak confidence and the duration. With heartbeat
+    set, a "<TYPE>_ONGOING" summary is also emitted every heartbeat seconds
+    while the detection stays open.
+
+    Call update() on every detector run, including runs with no detections,
+    so that open events can close.
+    """
+
+    def __init__(self, end_after: float = 1.5, heartbeat: Optional[float] = None):
+        self.end_after = end_after
+        self.heartbeat = heartbeat
+        self.open: Dict[str, OpenEvent] = {}
+
+    def update(self, detections: List[dict], now: Optional[float] = None) -> List[dict]:
+        """
+        Returns:
+            Events to emit for this detector run
+        """
+        now = time.time() if now is None else now
+        emitted = []
+
+        # Several boxes of the same kind in one frame count as one observation
+        current: Dict[str, dict] = {}
+        for e in detections:
+            key = event_key(e)
+            if key not in current or e["confidence"] > current[key]["confidence"]:
+                current[key] = e
+
+        for key, e in current.items():
+            state = self.open.get(key)
+            if state is None:
+                self.open[key] = OpenEvent(e, now)
+                emitted.append(dict(e))
+            else:
+                state.observe(e, now)
+
+        for key, state in list(self.open.items()):
+            if now - state.last_seen > self.end_after:
+                emitted.append(state.summary("_END", now))
+                del self.open[key]
+            elif self.heartbeat and now - state.last_emit >= self.heartbeat:
+                emitted.append(state.summary("_ONGOING", now))
+                state.last_emit = now
+        return emitted
+
+    def flush(self, now: Optional[float] = None) -> List[dict]:
+        """Close every open event, e.g. when the camera stops"""
+        now = time.time() if now is None else now
+        emitted = [state.summary("_END", now) for state in self.open.values()]
+        self.open.clear()
+        return emitted
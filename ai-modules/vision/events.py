@@ -1,11 +1,17 @@
 import time
 
-def normalize(event, source="video", session_id=1):
-    return {
+def normalize(event, source="video", session_id=1, sensor_id=1):
+    normalized = {
         "source": source,
         "session_id": session_id,
-        "sensor_id": 1,
+        "sensor_id": sensor_id,
         "event_type": event["type"],
         "confidence": event["confidence"],
         "timestamp": time.time()
     }
+    # Summaries from the debouncer (see debounce.py), tracker ids (tracking.py)
+    # and evidence clip ids (evidence.py)
+    for key in ("duration", "peak_confidence", "track_id", "evidence"):
+        if event.get(key) is not None:
+            normalized[key] = event[key]
+    return normalized
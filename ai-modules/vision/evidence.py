@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Optional
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Event types that get an evidence clip attached
+EVIDENCE_TYPES = ("OBJECT_DETECTED", "GAZE_DEVIATION")
+
+
+class EvidenceStore:
+    """
+    Content-addressed clip store on local disk.
+
+    Each JPEG frame is written once as blobs/<sha256[:2]>/<sha256>.jpg, so
+    overlapping clips of the same moment share their frames. A clip is a
+    JSON manifest at clips/<clip_id>.json listing its frames in order.
+    Writes happen on the store's own thread (run()); submit() never blocks
+    and drops the clip when the write queue is full.
+
+    Args:
+        root: Store directory
+        max_queue: Clips waiting to be written before new ones are dropped
+    """
+
+    def __init__(self, root, max_queue: int = 16):
+        self.root = Path(root)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, clip: dict) -> bool:
+        try:
+            self.queue.put_nowait(clip)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Evidence write queue full, dropping clip {clip['clip_id']}")
+            return False
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.jpg"
+
+    def manifest_path(self, clip_id: str) -> Path:
+        return self.root / "clips" / f"{clip_id}.json"
+
+    def manifest(self, clip_id: str) -> Optional[dict]:
+        path = self.manifest_path(clip_id)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def write(self, clip: dict):
+        """Write a clip's frames (skipping blobs already stored) and then its manifest"""
+        frames = []
+        for ts, jpeg in clip["frames"]:
+            digest = hashlib.sha256(jpeg).hexdigest()
+            path = self.blob_path(digest)
+            if not path.exists():
+                self._write_atomic(path, jpeg)
+            frames.append({"timestamp": round(ts, 3), "sha256": digest})
+        manifest = {
+            "clip_id": clip["clip_id"],
+            "sensor_id": clip["sensor_id"],
+            "event_type": clip["event_type"],
+            "event_time": round(clip["event_time"], 3),
+            "frames": frames,
+        }
+        self._write_atomic(self.manifest_path(clip["clip_id"]), json.dumps(manifest).encode())
+        self.written += 1
+
+    def _write_logged(self, clip: dict):
+        with metrics.timer("evidence_write"):
+            try:
+                self.write(clip)
+            except OSError as e:
+                logger.error(f"Failed to write evidence clip {clip['clip_id']}: {e}")
+
+    def run(self, stop):
+        """Writer loop; run with pipeline.start_stage"""
+        while not stop.is_set():
+            try:
+                clip = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._write_logged(clip)
+
+    def flush(self):
+        """Write clips still queued; call after the recorders and writer have stopped"""
+        while True:
+            try:
+                clip = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            self._write_logged(clip)
+
+
+class EvidenceRecorder:
+    """
+    Rolling buffer of one camera's recent encoded frames, cut into clips
+    around violations.
+
+    run() follows the camera's FrameBroadcaster at fps and keeps the last
+    pre_seconds of JPEGs, encoded through the broadcaster's tier cache so a
+    dashboard viewer on the same tier and the recorder share each encode.
+    trigger() is called from the detection thread and only snapshots
+    references to the buffered frames; the recorder thread adds
+    post_seconds of frames and hands the clip to the EvidenceStore writer.
+
+    Memory is bounded: the buffer holds at most pre_seconds * fps frames and
+    max_bytes, and at most max_open clips collect post-event frames at once
+    (further triggers get no clip).
+
+    Args:
+        broadcaster: The camera's FrameBroadcaster
+        store: EvidenceStore the clips are written to
+        tier: Stream tier whose encodes are buffered (see broadcast.TIERS)
+    """
+
+    def __init__(self, broadcaster, store: EvidenceStore, sensor_id: int, pre_seconds: float = 5.0,
+                 post_seconds: float = 5.0, fps: float = 5.0, tier: str = "standard",
+                 max_bytes: int = 8 * 1024 * 1024, max_open: int = 4):
+        self.broadcaster = broadcaster
+        self.store = store
+        self.sensor_id = sensor_id
+        self.post_seconds = post_seconds
+        self.interval = 1.0 / fps
+        self.tier = tier
+        self.max_frames = max(1, int(pre_seconds * fps))
+        self.max_bytes = max_bytes
+        self.max_open = max_open
+        self.frames = deque()  # (timestamp, jpeg bytes)
+        self.bytes = 0
+        self.open = []
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add(self, jpeg: bytes, now: Optional[float] = None):
+        """Buffer one encoded frame and extend open clips; full clips go to the store"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.frames.append((now, jpeg))
+            self.bytes += len(jpeg)
+            while len(self.frames) > self.max_frames or (self.bytes > self.max_bytes and len(self.frames) > 1):
+                self.bytes -= len(self.frames.popleft()[1])
+            for clip in self.open:
+                clip["frames"].append((now, jpeg))
+        self.expire(now)
+
+    def expire(self, now: Optional[float] = None):
+        """Hand clips whose post-event window has passed to the store, even if frames stopped"""
+        now = time.time() if now is None else now
+        with self._lock:
+            done = [clip for clip in self.open if now >= clip["until"]]
+            self.open = [clip for clip in self.open if now < clip["until"]]
+        for clip in done:
+            self.store.submit(clip)
+
+    def trigger(self, event: dict, now: Optional[float] = None) -> Optional[str]:
+        """
+        Start a clip for event with the buffered frames as its pre-event part.
+
+        Returns:
+            Clip id to attach to the event, or None if max_open clips are
+            already being recorded
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if len(self.open) >= self.max_open:
+                self.skipped += 1
+                return None
+            clip_id = f"{self.sensor_id}-{int(now * 1000)}-{uuid.uuid4().hex[:8]}"
+            self.open.append({
+                "clip_id": clip_id,
+                "sensor_id": self.sensor_id,
+                "event_type": event["type"],
+                "event_time": now,
+                "until": now + self.post_seconds,
+                "frames": list(self.frames),
+            })
+        return clip_id
+
+    def run(self, stop):
+        """Recorder loop; run with pipeline.start_stage"""
+        seq = 0
+        next_at = 0.0
+        while not stop.is_set():
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            latest, frame = self.broadcaster.wait(seq, timeout=0.5)
+            if frame is None:
+                # Camera lost, replay ended or stream paused: close clips on time anyway
+                self.expire()
+                continue
+            seq, jpeg = self.broadcaster.jpeg(latest, frame, self.tier)
+            if jpeg is None:
+                self.expire()
+                continue
+            next_at = time.monotonic() + self.interval
+            self.add(jpeg)
+        # Close clips still collecting so they are written with what they have
+        with self._lock:
+            pending, self.open = self.open, []
+        for clip in pending:
+            self.store.submit(clip)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "buffered_frames": len(self.frames),
+                "buffered_bytes": self.bytes,
+                "open_clips": len(self.open),
+                "skipped": self.skipped,
+            }
@@ -0,0 +1,100 @@
+import logging
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameContext:
+    """
+    One camera frame plus derived views computed on first use and cached,
+    so any number of detectors share a single conversion per frame.
+
+    Detectors accept either a FrameContext or a raw BGR array (see
+    as_context). Views are read-only by convention: annotate the frame only
+    after every detector has run.
+
+    Args:
+        frame: BGR frame
+        sensor_id: Camera the frame came from
+        timestamp: Capture time, if known
+    """
+
+    def __init__(self, frame: np.ndarray, sensor_id: Optional[int] = None, timestamp: Optional[float] = None):
+        self.bgr = frame
+        self.sensor_id = sensor_id
+        self.timestamp = timestamp
+        # Face bounding box (x0, y0, x1, y1) in frame pixels, set by the
+        # first detector that finds one (GazeDetector)
+        self.face_box: Optional[Tuple[int, int, int, int]] = None
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def rgb(self) -> np.ndarray:
+        return self._cached("rgb", lambda: cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB))
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self._cached("gray", lambda: cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def mp_image(self):
+        """Full-frame MediaPipe image built from the shared RGB view"""
+        def build():
+            import mediapipe as mp
+            return mp.Image(image_format=mp.ImageFormat.SRGB, data=self.rgb)
+        return self._cached("mp_image", build)
+
+    def resized(self, width: int) -> np.ndarray:
+        """BGR frame downscaled to width, keeping the aspect ratio"""
+        def build():
+            h, w = self.bgr.shape[:2]
+            return cv2.resize(self.bgr, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+        return self._cached(("resized", width), build)
+
+    def letterbox(self, size: int, color=(114, 114, 114)):
+        """
+        RGB frame scaled to fit a size x size square and padded, for models
+        with a fixed square input.
+
+        Returns:
+            (image, scale, (pad_x, pad_y)); frame coordinates are
+            (x - pad_x) / scale, (y - pad_y) / scale
+        """
+        def build():
+            h, w = self.bgr.shape[:2]
+            scale = min(size / w, size / h)
+            nw, nh = round(w * scale), round(h * scale)
+            pad_x, pad_y = (size - nw) // 2, (size - nh) // 2
+            image = np.full((size, size, 3), color, dtype=np.uint8)
+            image[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(self.rgb, (nw, nh), interpolation=cv2.INTER_LINEAR)
+            return image, scale, (pad_x, pad_y)
+        return self._cached(("letterbox", size), build)
+
+    def face_crop(self, margin: float = 0.2) -> Optional[np.ndarray]:
+        """RGB crop around face_box grown by margin on each side, or None without a face"""
+        if self.face_box is None:
+            return None
+
+        def build():
+            x0, y0, x1, y1 = self.face_box
+            mx, my = (x1 - x0) * margin, (y1 - y0) * margin
+            h, w = self.bgr.shape[:2]
+            return self.rgb[max(0, int(y0 - my)):min(h, int(y1 + my)), max(0, int(x0 - mx)):min(w, int(x1 + mx))]
+        return self._cached(("face_crop", self.face_box, margin), build)
+
+
+def as_context(frame) -> FrameContext:
+    """Wrap a raw frame so detectors can be called with either"""
+    return frame if isinstance(frame, FrameContext) else FrameContext(frame)
@@ -0,0 +1,121 @@
+import secrets
+import logging
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Slot sequence while the writer is filling it
+WRITING = -1
+
+
+class FrameRing:
+    """
+    Fixed-shape frame slots in shared memory, written by one capture process
+    and read by any number of detector processes without copying.
+
+    Layout: an int64 header (latest committed sequence, then one sequence
+    per slot) followed by the frame slots. The writer marks a slot WRITING,
+    fills it in place and commits it with the next sequence number. Readers
+    take a view of the newest committed slot and, once done with it, call
+    valid() to check the writer has not lapped them; with N slots a reader
+    has N - 1 frame intervals before its slot is reused.
+
+    Create the ring in the capture process with create=True and pass
+    (name, shape, slots) to the readers, which attach with create=False.
+    Only the creator unlinks the shared memory.
+
+    Args:
+        shape: Frame shape, e.g. (480, 640, 3)
+        slots: Number of frame slots
+        name: Shared memory name; generated when creating and omitted
+        create: Allocate the segment instead of attaching to an existing one
+    """
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 4, name: Optional[str] = None, create: bool = False,
+                 dtype=np.uint8):
+        if slots < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        header_bytes = (slots + 1) * 8
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        if create:
+            name = name or f"sai_frames_{secrets.token_hex(4)}"
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=header_bytes + frame_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.owner = create
+
+        header = np.ndarray((slots + 1,), dtype=np.int64, buffer=self.shm.buf)
+        self._head = header[:1]
+        self._seqs = header[1:]
+        self._frames = np.ndarray((slots, *self.shape), dtype=self.dtype, buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            header[:] = 0
+        self._writing = None
+
+    # Writer side (single capture process)
+
+    def acquire(self) -> np.ndarray:
+        """Return the next slot, marked WRITING, for the caller to fill in place"""
+        slot = int(self._head[0] + 1) % self.slots
+        self._seqs[slot] = WRITING
+        self._writing = slot
+        return self._frames[slot]
+
+    def commit(self) -> int:
+        """Publish the slot returned by acquire(); returns its sequence number"""
+        seq = int(self._head[0]) + 1
+        self._seqs[self._writing] = seq
+        self._head[0] = seq
+        self._writing = None
+        return seq
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copy a frame into the next slot and publish it (when in-place fill is not possible)"""
+        np.copyto(self.acquire(), frame)
+        return self.commit()
+
+    # Reader side
+
+    @property
+    def seq(self) -> int:
+        return int(self._head[0])
+
+    def latest(self, after_seq: int = 0) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        View of the newest committed frame, without copying.
+
+        Returns:
+            (seq, frame view), or (after_seq, None) if nothing newer than
+            after_seq has been committed
+        """
+        seq = int(self._head[0])
+        if seq <= after_seq:
+            return after_seq, None
+        slot = seq % self.slots
+        if self._seqs[slot] != seq:
+            # Lapped between reading the head and the slot
+            return after_seq, None
+        return seq, self._frames[slot]
+
+    def get(self, seq: int) -> Optional[np.ndarray]:
+        """View of the frame with sequence seq, or None if its slot was reused"""
+        if not self.valid(seq):
+            return None
+        return self._frames[seq % self.slots]
+
+    def valid(self, seq: int) -> bool:
+        """Whether the slot holding seq still holds it, i.e. a view of it was not overwritten"""
+        return int(self._seqs[seq % self.slots]) == seq
+
+    def close(self):
+        # Views into the buffer must be released before the segment can close
+        self._head = self._seqs = self._frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
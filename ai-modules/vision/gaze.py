@@ -1,95 +1,146 @@
-import cv2
 import numpy as np
 import mediapipe as mp
+from mediapipe.tasks.python import vision
 from mediapipe.tasks.python.vision import face_landmarker
 import urllib.request
 import os
 import logging
+import landmarker
+from model_cache import FACE_LANDMARKER, FACE_LANDMARKER_URL, MODEL_DIR, resolve
+from frame_context import as_context
 
 logger = logging.getLogger(__name__)
 
+# Landmarks used by the gaze logic: nose tip, cheeks, iris centres, and
+# forehead/chin for the face ROI
+NOSE_TIP, LEFT_CHEEK, RIGHT_CHEEK, LEFT_IRIS, RIGHT_IRIS, FOREHEAD, CHIN = 1, 234, 454, 468, 473, 10, 152
+GAZE_POINTS = (NOSE_TIP, LEFT_CHEEK, RIGHT_CHEEK, LEFT_IRIS, RIGHT_IRIS, FOREHEAD, CHIN)
+
+
 class GazeDetector:
-    def __init__(self):
+    """
+    Head-pose based gaze deviation detector on MediaPipe Face Landmarker.
+
+    Args:
+        running_mode: "video" (default) uses MediaPipe's temporal face tracking
+            and timestamps; "image" detects independently on every call
+        roi_margin: In image mode, crop to the previous face box grown by this
+            fraction on each side; None disables cropping. Video mode already
+            tracks the face internally and always gets the full frame.
+        offline: Raise ModelCacheError when the model is not cached instead of
+            downloading it (or disabling gaze detection if the download fails)
+    """
+
+    def __init__(self, running_mode="video", roi_margin=0.3, model_dir=MODEL_DIR, offline=False):
+        self.running_mode = running_mode
+        self.roi_margin = roi_margin if running_mode == "image" else None
+        self.roi = None
+        self._clock = landmarker.VideoClock()
+        model_path = resolve(FACE_LANDMARKER, model_dir, offline)
         try:
             # Download the face landmarker model if not present
-            model_path = "face_landmarker.task"
-            if not os.path.exists(model_path):
+            if model_path == FACE_LANDMARKER and not os.path.exists(model_path):
                 logger.info("Downloading face landmarker model...")
-                model_url = "https://storage.googleapis.com/mediapipe-models/vision/face_landmarker/float16/1/face_landmarker.task"
                 try:
-                    urllib.request.urlretrieve(model_url, model_path)
+                    urllib.request.urlretrieve(FACE_LANDMARKER_URL, model_path)
                     logger.info(f"Model downloaded to {model_path}")
                 except Exception as e:
                     logger.warning(f"Could not download model: {e}")
                     logger.warning("Gaze detection will be disabled")
                     self.face_landmarker = None
                     return
-            
+
             # Use the downloaded model
             base_options = mp.tasks.BaseOptions(model_asset_path=model_path)
             options = face_landmarker.FaceLandmarkerOptions(
                 base_options=base_options,
+                running_mode=vision.RunningMode.VIDEO if running_mode == "video" else vision.RunningMode.IMAGE,
                 output_face_blendshapes=False,
                 output_facial_transformation_matrixes=False,
                 num_faces=1
             )
             self.face_landmarker = face_landmarker.FaceLandmarker.create_from_options(options)
-            logger.info("Gaze detector initialized successfully")
+            logger.info(f"Gaze detector initialized successfully ({running_mode} mode)")
         except Exception as e:
             logger.error(f"Failed to initialize gaze detector: {e}")
+            if offline:
+                raise
             self.face_landmarker = None
 
+    def warmup(self, shape=(480, 640, 3), runs=2):
+        """Run dummy inferences so graph setup is paid before the first live frame"""
+        if self.face_landmarker is not None:
+            landmarker.warmup(self.detect, shape, runs)
+
+    def _mp_image(self, ctx):
+        """Return (mp.Image, shape, x0, y0) for the previous face ROI, or the shared full frame"""
+        if self.roi is None:
+            return ctx.mp_image, ctx.shape, 0, 0
+        x0, y0, x1, y1 = self.roi
+        crop = np.ascontiguousarray(ctx.rgb[y0:y1, x0:x1])
+        return mp.Image(image_format=mp.ImageFormat.SRGB, data=crop), crop.shape, x0, y0
+
+    def _update_roi(self, points, shape):
+        if self.roi_margin is None:
+            return
+        h, w = shape[:2]
+        (x_min, y_min), (x_max, y_max) = points.min(axis=0), points.max(axis=0)
+        mx, my = (x_max - x_min) * self.roi_margin, (y_max - y_min) * self.roi_margin
+        self.roi = (
+            max(0, int(x_min - mx)), max(0, int(y_min - my)),
+            min(w, int(x_max + mx)), min(h, int(y_max + my)),
+        )
+
     def detect(self, frame):
+        """
+        Args:
+            frame: BGR frame or FrameContext; with a context the RGB
+                conversion is shared and the face box is stored on it
+        """
         if self.face_landmarker is None:
             # Fallback: no detection available
             return None
-            
-        # Convert frame to RGB
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Convert to MediaPipe Image format
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-        
+
+        ctx = as_context(frame)
+        mp_image, shape, x0, y0 = self._mp_image(ctx)
+
         # Detect face landmarks
-        detection_result = self.face_landmarker.detect(mp_image)
-        
+        if self.running_mode == "video":
+            detection_result = self.face_landmarker.detect_for_video(mp_image, self._clock.next_ms())
+        else:
+            detection_result = self.face_landmarker.detect(mp_image)
+
         if not detection_result.face_landmarks or len(detection_result.face_landmarks) == 0:
+            if self.roi is not None:
+                # Lost the face inside the crop: search the full frame next time
+                self.roi = None
             return None
 
-        # Convert landmarks to image coordinates
+        # Convert only the landmarks we use to frame pixel coordinates
         landmarks = detection_result.face_landmarks[0]
-        mesh_points = np.array([[int(p.x * frame.shape[1]), int(p.y * frame.shape[0])] for p in landmarks])
-        
-        # Iris indices
-        # Left iris: 474-477, Right iris: 469-472
-        # Center of eyes (approx)
-        left_iris = mesh_points[468]
-        right_iris = mesh_points[473]
-        
-        # Eye corners for reference
-        # Left eye: 33 (inner), 133 (outer)
-        # Right eye: 362 (inner), 263 (outer)
-        
-        # Simple Logic: Check relative position of iris within eye
-        # For this demo, we'll return a basic "Looking Away" if head pose is extreme or iris is off-center
-        
-        # Placeholder for complex vector math - using head pose approximation
-        # Nose tip: 1
-        nose_tip = mesh_points[1]
-        left_cheek = mesh_points[234]
-        right_cheek = mesh_points[454]
-        
+        normalized = np.array([(landmarks[i].x, landmarks[i].y) for i in GAZE_POINTS], dtype=np.float32)
+        points = normalized * (shape[1], shape[0]) + (x0, y0)
+        self._update_roi(points, ctx.shape)
+        (bx0, by0), (bx1, by1) = points.min(axis=0), points.max(axis=0)
+        ctx.face_box = (int(bx0), int(by0), int(bx1), int(by1))
+
+        # Simple Logic: head pose approximation from the nose position
+        # between the cheeks
+        nose_tip, left_cheek, right_cheek = points[0], points[1], points[2]
+
         # Calculate horizontal balance
         face_width = right_cheek[0] - left_cheek[0]
+        if face_width == 0:
+            return None
         nose_offset = nose_tip[0] - left_cheek[0]
         ratio = nose_offset / face_width
-        
+
         direction = "CENTER"
         if ratio < 0.4:
             direction = "LOOKING LEFT"
         elif ratio > 0.6:
             direction = "LOOKING RIGHT"
-            
+
         if direction != "CENTER":
             return {
                 "type": "GAZE_DEVIATION",
@@ -0,0 +1,396 @@
+"""
+Candidate identity verification against enrolled reference photos.
+
+Enrollment embeddings are computed once and stored as one contiguous
+float32 matrix, so matching a live face against every registered student
+is a single matrix-vector product. Enroll a directory of photos named
+<student_id>.jpg (or <student_id>_<n>.jpg for several per student) with:
+
+    python identity.py --enroll photos/
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+import cv2
+import numpy as np
+from metrics import metrics
+from model_cache import FACENET_WEIGHTS, MODEL_DIR, resolve
+from pipeline import LatestQueue
+from tracking import iou
+
+logger = logging.getLogger(__name__)
+
+ENROLLMENT_PATH = Path(os.getenv("SAI_ENROLLMENT", Path(MODEL_DIR) / "enrollment.npz"))
+EMBEDDING_SIZE = 512
+
+
+class FaceEmbedder:
+    """
+    FaceNet (InceptionResnetV1, VGGFace2) on CPU: RGB face crops in,
+    L2-normalised 512-d embeddings out. Faces come from the FaceLandmarker
+    box on the frame context, so no separate face detector runs.
+
+    Args:
+        threads: Limit torch's intra-op threads. The setting is process-wide,
+            so only pass it where nothing else runs torch (EmbedderProcess
+            does); None leaves it alone
+        offline: Raise ModelCacheError when the weights are not cached
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, threads=None, offline=False):
+        try:
+            import torch
+            from facenet_pytorch import InceptionResnetV1
+        except ImportError as e:
+            raise ImportError("Identity verification needs torch and facenet-pytorch installed") from e
+        self.torch = torch
+        if threads is not None:
+            torch.set_num_threads(threads)
+        weights = resolve(FACENET_WEIGHTS, model_dir, offline)
+        if weights == FACENET_WEIGHTS and not Path(weights).exists():
+            # Not cached and downloads allowed: let facenet-pytorch fetch it
+            self.model = InceptionResnetV1(pretrained="vggface2", device="cpu")
+        else:
+            # The checkpoint includes the VGGFace2 classifier head
+            self.model = InceptionResnetV1(num_classes=8631, device="cpu")
+            self.model.load_state_dict(torch.load(weights, map_location="cpu"))
+        self.model.eval()
+
+    def embed(self, crops: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Returns:
+            (len(crops), 512) float32 array of unit-length embeddings
+        """
+        if not crops:
+            return np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        batch = np.stack([cv2.resize(c, (160, 160), interpolation=cv2.INTER_AREA) for c in crops])
+        # facenet-pytorch's fixed_image_standardization
+        batch = (batch.astype(np.float32) - 127.5) / 128.0
+        with self.torch.inference_mode():
+            out = self.model(self.torch.from_numpy(batch).permute(0, 3, 1, 2)).numpy()
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+def embedder_main(model_dir, threads, offline, requests, results):
+    """EmbedderProcess child: load FaceNet, then embed each batch of crops sent"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - worker[identity] - %(levelname)s - %(message)s")
+    try:
+        embedder = FaceEmbedder(model_dir, threads, offline)
+    except Exception as e:
+        results.put((None, f"{type(e).__name__}: {e}"))
+        return
+    results.put((None, None))
+    while (crops := requests.get()) is not None:
+        try:
+            results.put((embedder.embed(crops), None))
+        except Exception as e:
+            results.put((None, f"{type(e).__name__}: {e}"))
+
+
+class EmbedderProcess:
+    """
+    FaceEmbedder in its own process, so its torch thread limit does not
+    apply to the torch YOLO backend in the vision process. Crops and
+    embeddings are small, so passing them through queues costs far less
+    than the embedding itself. Same embed() interface as FaceEmbedder;
+    calls from several verifier threads are serialized.
+
+    A child that dies or is stopped after a timeout is restarted on a later
+    embed() call once its backoff delay has passed, like WorkerPool's
+    detector workers; calls in between raise RuntimeError.
+
+    Args:
+        threads: torch intra-op threads in the child
+        ready_timeout: Seconds to wait for the model to load
+        backoff_base: First restart delay in seconds, doubled per restart
+        backoff_max: Restart delay cap in seconds
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, threads=1, offline=False, ready_timeout=120.0,
+                 backoff_base=1.0, backoff_max=30.0):
+        self.model_dir = str(model_dir)
+        self.threads = threads
+        self.offline = offline
+        self.ready_timeout = ready_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.restarts = 0
+        self.restart_at = 0.0
+        self.last_error = None
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Lock()
+        self._launch()
+
+    def _launch(self):
+        self.requests = self._ctx.Queue()
+        self.results = self._ctx.Queue()
+        self.process = self._ctx.Process(
+            target=embedder_main,
+            args=(self.model_dir, self.threads, self.offline, self.requests, self.results),
+            name="identity-embedder",
+            daemon=True,
+        )
+        self.process.start()
+        try:
+            _, error = self.results.get(timeout=self.ready_timeout)
+        except queue.Empty:
+            error = f"not ready after {self.ready_timeout}s"
+        if error:
+            self.close()
+            raise RuntimeError(f"Face embedder failed to start: {error}")
+        logger.info(f"Face embedder process ready (PID {self.process.pid}, {self.threads} torch threads)")
+
+    def check_health(self, now=None) -> bool:
+        """
+        Restart a dead child once its backoff delay has passed.
+
+        Returns:
+            Whether the child is running
+        """
+        if self.process.is_alive():
+            return True
+        now = time.monotonic() if now is None else now
+        if self.restart_at == 0.0:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** self.restarts))
+            self.restart_at = now + delay
+            logger.warning(f"Face embedder exited with code {self.process.exitcode}, restarting in {delay:.1f}s")
+            return False
+        if now < self.restart_at:
+            return False
+        self.restarts += 1
+        self.restart_at = 0.0
+        try:
+            self._launch()
+        except RuntimeError as e:
+            self.last_error = str(e)
+            logger.error(str(e))
+            return False
+        return True
+
+    def embed(self, crops: Sequence[np.ndarray], timeout: float = 10.0) -> np.ndarray:
+        """
+        Raises:
+            RuntimeError: if the child failed, is down awaiting its restart or
+                did not answer in time
+        """
+        with self._lock:
+            if not self.check_health():
+                raise RuntimeError("Face embedder process is down, waiting to restart it")
+            self.requests.put(list(crops))
+            try:
+                embeddings, error = self.results.get(timeout=timeout)
+            except queue.Empty:
+                # A late answer would be taken as the next call's result
+                self.process.terminate()
+                self.process.join(1.0)
+                self.last_error = f"no answer within {timeout}s"
+                raise RuntimeError(f"Face embedder did not answer within {timeout}s; stopped it")
+        if error:
+            self.last_error = error
+            raise RuntimeError(f"Face embedding failed: {error}")
+        return embeddings
+
+    def snapshot(self) -> dict:
+        return {
+            "alive": self.process.is_alive(),
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
+
+    def close(self, timeout: float = 5.0):
+        if self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class EnrollmentStore:
+    """
+    Enrollment embeddings for all registered students in one contiguous
+    (n, 512) float32 matrix, persisted as .npz. Rows are unit length, so
+    cosine similarity against every enrolled face is one matmul.
+    """
+
+    def __init__(self, path=ENROLLMENT_PATH):
+        self.path = Path(path)
+        self.ids = np.empty(0, dtype=str)
+        self.embeddings = np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        if self.path.exists():
+            self.load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def load(self):
+        with np.load(self.path) as data:
+            self.ids = data["ids"]
+            self.embeddings = np.ascontiguousarray(data["embeddings"], dtype=np.float32)
+        logger.info(f"Loaded {len(self.ids)} enrollment embeddings from {self.path}")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp.npz")
+        np.savez(tmp, ids=self.ids, embeddings=self.embeddings)
+        os.replace(tmp, self.path)
+
+    def add(self, student_ids: Sequence[str], embeddings: np.ndarray):
+        """Append rows; several rows per student are allowed"""
+        self.ids = np.concatenate([self.ids, np.asarray(student_ids, dtype=str)])
+        self.embeddings = np.ascontiguousarray(np.vstack([self.embeddings, embeddings]), dtype=np.float32)
+
+    def match(self, embedding: np.ndarray):
+        """
+        Returns:
+            (student_id, cosine similarity) of the closest enrolled face, or
+            (None, 0.0) when nobody is enrolled
+        """
+        if not len(self.ids):
+            return None, 0.0
+        scores = self.embeddings @ embedding
+        best = int(np.argmax(scores))
+        return str(self.ids[best]), float(scores[best])
+
+
+class FaceVerifier:
+    """
+    Periodic / face-change-triggered identity checks for one camera.
+
+    offer() is called from the detect stage with each frame context and only
+    decides whether to verify: on a new face (box moved by more than
+    change_iou, or the face came back after absent_after seconds) or every
+    interval seconds. The face crop is then handed to a background thread
+    that embeds it and matches it against the enrollment matrix, so the
+    detect stage never waits on FaceNet.
+
+    Events:
+        IDENTITY_VERIFIED when the face matches the expected student (or any
+        enrolled student without one), emitted on the transition only;
+        IDENTITY_MISMATCH when it matches a different student;
+        UNKNOWN_FACE when no enrolled face is above threshold.
+
+    Args:
+        embedder: EmbedderProcess (or an in-process FaceEmbedder)
+        on_event: Callback receiving each event dict
+        expected_id: Student expected in front of this camera, if known
+    """
+
+    def __init__(self, store: EnrollmentStore, embedder, on_event: Callable[[dict], None],
+                 expected_id: Optional[str] = None, interval: float = 30.0, threshold: float = 0.6,
+                 change_iou: float = 0.3, absent_after: float = 5.0):
+        self.store = store
+        self.embedder = embedder
+        self.on_event = on_event
+        self.expected_id = expected_id
+        self.interval = interval
+        self.threshold = threshold
+        self.change_iou = change_iou
+        self.absent_after = absent_after
+        self.crops = LatestQueue()
+        self.last_box = None
+        self.last_check = float("-inf")
+        self.last_seen = float("-inf")
+        self.verified = False
+        self.checks = 0
+
+    def offer(self, ctx, now: Optional[float] = None) -> bool:
+        """Queue a verification of ctx's face if a trigger fired; returns True if queued"""
+        now = time.monotonic() if now is None else now
+        box = ctx.face_box
+        if box is None:
+            return False
+        changed = (
+            self.last_box is None
+            or now - self.last_seen > self.absent_after
+            or iou(box, self.last_box) < self.change_iou
+        )
+        self.last_seen = now
+        if not changed and now - self.last_check < self.interval:
+            return False
+        self.last_box = box
+        self.last_check = now
+        # Copy the crop: the context's views are released with the frame
+        self.crops.put(ctx.face_crop().copy())
+        return True
+
+    def verify(self, crop: np.ndarray) -> Optional[dict]:
+        embedding = self.embedder.embed([crop])[0]
+        student_id, score = self.store.match(embedding)
+        self.checks += 1
+        if student_id is None or score < self.threshold:
+            self.verified = False
+            return {"type": "UNKNOWN_FACE", "confidence": round(1.0 - max(score, 0.0), 4)}
+        if self.expected_id is not None and student_id != self.expected_id:
+            self.verified = False
+            logger.warning(f"Identity mismatch: expected {self.expected_id}, matched {student_id} ({score:.2f})")
+            return {"type": "IDENTITY_MISMATCH", "confidence": round(score, 4)}
+        if self.verified:
+            return None
+        self.verified = True
+        logger.info(f"Identity verified: {student_id} ({score:.2f})")
+        return {"type": "IDENTITY_VERIFIED", "confidence": round(score, 4)}
+
+    def run(self, stop):
+        """Verification loop; run with pipeline.start_stage"""
+        while not stop.is_set():
+            crop = self.crops.get(timeout=0.5)
+            if crop is None:
+                continue
+            start = time.perf_counter()
+            try:
+                event = self.verify(crop)
+            except RuntimeError as e:
+                logger.error(f"Identity check failed: {e}")
+                continue
+            metrics.observe("identity", time.perf_counter() - start)
+            if event is not None:
+                self.on_event(event)
+
+
+def enroll(photo_dir, store_path=ENROLLMENT_PATH, model_dir=MODEL_DIR):
+    """Embed every <student_id>[_n].jpg/png in photo_dir and write the enrollment store"""
+    from frame_context import FrameContext
+    from gaze import GazeDetector
+
+    faces = GazeDetector(running_mode="image", roi_margin=None, model_dir=model_dir)
+    if faces.face_landmarker is None:
+        raise RuntimeError("Face landmarker model unavailable; cannot locate faces for enrollment")
+    embedder = FaceEmbedder(model_dir=model_dir)
+    ids, crops = [], []
+    for path in sorted(Path(photo_dir).iterdir()):
+        if path.suffix.lower() not in (".jpg", ".jpeg", ".png"):
+            continue
+        image = cv2.imread(str(path))
+        if image is None:
+            logger.warning(f"Skipping unreadable {path.name}")
+            continue
+        ctx = FrameContext(image)
+        faces.detect(ctx)
+        if ctx.face_box is None:
+            logger.warning(f"No face found in {path.name}")
+            continue
+        ids.append(path.stem.split("_")[0])
+        crops.append(ctx.face_crop())
+    store = EnrollmentStore(store_path)
+    store.ids = np.empty(0, dtype=str)
+    store.embeddings = np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+    store.add(ids, embedder.embed(crops))
+    store.save()
+    logger.info(f"Enrolled {len(set(ids))} students ({len(ids)} photos) into {store.path}")
+    return store
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage identity verification enrollment")
+    parser.add_argument("--enroll", required=True, help="Directory of <student_id>.jpg reference photos")
+    parser.add_argument("--store", default=str(ENROLLMENT_PATH))
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    args = parser.parse_args()
+    enroll(args.enroll, args.store, args.model_dir)
@@ -0,0 +1,24 @@
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VideoClock:
+    """Millisecond timestamps for MediaPipe VIDEO mode, which requires them strictly increasing"""
+
+    def __init__(self):
+        self.last = 0
+
+    def next_ms(self) -> int:
+        ts = max(int(time.monotonic() * 1000), self.last + 1)
+        self.last = ts
+        return ts
+
+
+def warmup(detect, shape=(480, 640, 3), runs=2):
+    """Run dummy inferences through detect so graph setup is paid before the first live frame"""
+    frame = np.zeros(shape, dtype=np.uint8)
+    for _ in range(runs):
+        detect(frame)
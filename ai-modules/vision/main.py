@@ -1,14 +1,37 @@
+import argparse
+import functools
 import cv2
+import os
+import sys
 import threading
 import requests
 import time
 import logging
+from pathlib import Path
 from camera import Camera
-from objects import ObjectDetector
+from replay import ReplaySource, is_replay_source
+from objects import ObjectDetector, BACKENDS
 from gaze import GazeDetector
+from pose import PoseDetector
+from identity import ENROLLMENT_PATH, EmbedderProcess, EnrollmentStore, FaceVerifier
+from evidence import EVIDENCE_TYPES, EvidenceRecorder, EvidenceStore
 from events import normalize
+from pipeline import LatestQueue, start_stage
+from frame_ring import FrameRing
+from metrics import metrics
+from motion import MotionGate
+from frame_context import FrameContext
+from workers import WorkerPool, build_gaze_detector, build_object_detector, build_pose_detector
+from scheduler import RateController
+from multicam import CameraManager, parse_source
+from debounce import EventDebouncer
+from tracking import IoUTracker
+from model_cache import ModelCacheError
 import server
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from event_client import EventClient
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,27 +39,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-BACKEND_URL = "http://localhost:8000/events"
+BACKEND_URL = "http://localhost:8000"
+SENSOR_ID = 1
 
-def run_vision_loop():
-    cam = None
-    obj = ObjectDetector()
-    gaze = GazeDetector()
-    
+# Target inference rate per detector (Hz) and detector CPU seconds allowed
+# per wall-clock second for one camera
+DETECTOR_RATES = {"objects": 5.0, "gaze": 15.0}
+CPU_BUDGET = 0.8
+
+# Pose runs in its own stage with its own rate and budget, so it never
+# slows the object/gaze schedule down
+POSE_RATE = 5.0
+POSE_CPU_BUDGET = 0.5
+
+# Identity checks run in the background every IDENTITY_INTERVAL seconds and
+# whenever the face changes (see FaceVerifier)
+IDENTITY_INTERVAL = 30.0
+
+# A detection is closed after END_AFTER seconds unseen; HEARTBEAT (seconds,
+# or None) emits a summary while it stays open
+END_AFTER = 1.5
+HEARTBEAT = 30.0
+
+# Process mode: camera frames are decoded into a shared-memory ring shaped
+# like the source's first frame (see probe_frame_shape), and detector results
+# are awaited this long per frame. At 30 fps, 8 slots give a worker ~230 ms
+# before its frame is reused.
+RING_SLOTS = 8
+
+# Capture format requested from live cameras (see Camera)
+CAMERA_OPTIONS = {"width": 640, "height": 480, "fps": 30, "fourcc": "MJPG", "buffer_size": 1}
+
+# Playback of video file / frame directory sources (see ReplaySource)
+REPLAY_OPTIONS = {"speed": "native", "loop": False}
+
+# Evidence clips around violations (see EvidenceRecorder); frames come from
+# the "standard" stream tier
+EVIDENCE_DIR = os.getenv("SAI_EVIDENCE_DIR", "evidence")
+EVIDENCE_OPTIONS = {"pre_seconds": 5.0, "post_seconds": 5.0, "fps": 5.0, "tier": "standard"}
+RESULT_TIMEOUT = 0.2
+
+def fetch_session_id():
     # Fetch active session ID
     session_id = 1
     try:
-        resp = requests.get("http://localhost:8000/examinations/active", timeout=2)
+        resp = requests.get(f"{BACKEND_URL}/examinations/active", timeout=2)
         if resp.ok and resp.json():
             session_id = resp.json().get("id", 1)
             logger.info(f"Connected to active examination session: {session_id}")
     except Exception as e:
         logger.warning(f"Could not fetch active examination, using default ID 1: {e}")
+    return session_id
 
-    logger.info("Vision Module Started")
-    logger.info(f"Camera active status: {server.camera_active}")
 
-    while True:
+def open_source(source, zero_copy=False):
+    """Open a replayed recording or a camera; zero_copy keeps live reads on the caller's thread"""
+    if is_replay_source(source):
+        return ReplaySource(source, **REPLAY_OPTIONS)
+    return Camera(source, **CAMERA_OPTIONS, threaded=False if zero_copy else None)
+
+
+def probe_frame_shape(source):
+    """
+    Shape of the frames source delivers, read from one frame so a FrameRing
+    matches the resolution the camera negotiated (or the recording's).
+    Falls back to the requested capture size if no frame can be read.
+    """
+    requested = (CAMERA_OPTIONS["height"], CAMERA_OPTIONS["width"], 3)
+    try:
+        cam = open_source(source, zero_copy=True)
+    except Exception as e:
+        logger.warning(f"Cannot open {source} to probe its frame size, assuming {requested}: {e}")
+        return requested
+    try:
+        frame = cam.read()
+    finally:
+        cam.release()
+    if frame is None:
+        logger.warning(f"No frame from {source} to probe its frame size, assuming {requested}")
+        return requested
+    return frame.shape
+
+
+def capture_stage(frames, stop, source=0):
+    """
+    Read frames as fast as the camera delivers them; never waits on models or network.
+
+    frames is a LatestQueue, or a FrameRing whose slots the camera decodes
+    into directly for detector processes to read without copying. With a
+    ring, live cameras run without their grab thread: this loop already
+    does nothing but drain the camera, and a grab thread would decode into
+    its own array and add a copy into the slot.
+    """
+    ring = isinstance(frames, FrameRing)
+    cam = None
+    while not stop.is_set():
         if not server.camera_active:
             if cam is not None:
                 cam.release()
@@ -48,53 +145,675 @@ def run_vision_loop():
         if cam is None:
             logger.info("Initializing camera...")
             try:
-                cam = Camera()
+                cam = open_source(source, zero_copy=ring)
                 logger.info("Camera initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize camera: {e}")
                 time.sleep(2)
                 continue
             
-        frame = cam.read()
+        with metrics.timer("camera_read"):
+            frame = cam.read(out=frames.acquire() if ring else None)
+        if frame is None and getattr(cam, "finished", False):
+            # End of a replayed recording ends the run
+            stop.set()
+            break
         if frame is None:
             logger.warning("Failed to read frame from camera")
             time.sleep(0.1)
             continue
+        if ring:
+            frames.commit()
+        else:
+            frames.put(frame)
+
+    if cam:
+        cam.release()
 
-        # detection
-        detected_objects = obj.detect(frame)
-        gaze_result = gaze.detect(frame)
 
-        # Drawing and sending events
-        for e in detected_objects:
-            try:
-                requests.post(BACKEND_URL, json=normalize(e, session_id=session_id), timeout=1)
-                if server.captions_active:
-                    cv2.putText(frame, f"{e['object']} ({e['confidence']:.2f})", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            except Exception as ex:
-                logger.error(f"Error sending object event: {ex}")
+def publish_results(frame, sensor_id, detected_objects, gaze_result, emitted, client, session_id):
+    """
+    Annotate the frame, send debounced events and publish the frame to the
+    stream. Violation events get a reference to an evidence clip when the
+    camera has an EvidenceRecorder.
+    """
+    recorder = server.evidence_recorders.get(sensor_id)
+    for e in emitted:
+        if recorder is not None and e["type"] in EVIDENCE_TYPES:
+            e = {**e, "evidence": recorder.trigger(e)}
+        client.send(normalize(e, session_id=session_id, sensor_id=sensor_id))
+    metrics.incr("frames_processed")
+    if emitted:
+        metrics.incr("events_emitted", len(emitted))
 
+    annotate_start = time.perf_counter()
+    if server.captions_active:
+        for e in detected_objects:
+            label = f"{e['object']} ({e['confidence']:.2f})"
+            if e.get("track_id") is not None:
+                label += f" #{e['track_id']}"
+            if e.get("box"):
+                x1, y1, x2, y2 = (int(v) for v in e["box"])
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+                cv2.putText(frame, label, (x1, max(y1 - 8, 15)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+            else:
+                cv2.putText(frame, label, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
         if gaze_result:
-            try:
-                requests.post(BACKEND_URL, json=normalize(gaze_result, session_id=session_id), timeout=1)
-                if server.captions_active:
-                    cv2.putText(frame, f"GAZE: {gaze_result['direction']}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            except Exception as ex:
-                logger.error(f"Error sending gaze event: {ex}")
-
-        # Update streaming frame
-        with server.lock:
-            server.output_frame = frame.copy()
-        
-        # throttle to save CPU
-        time.sleep(0.03)
+            cv2.putText(frame, f"GAZE: {gaze_result['direction']}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+
+    metrics.observe("annotate", time.perf_counter() - annotate_start)
+
+    # The capture stage hands over a fresh array per read, so the detection
+    # stage owns it and no copy is needed.
+    server.publish_frame(sensor_id, frame)
+
+
+def suspicious_only(detections):
+    """Person boxes are only tracked; suspicious objects become events"""
+    return [e for e in detections if e["type"] == "OBJECT_DETECTED"]
+
+
+def check_motion(gate, frame):
+    """Motion flag for this frame (always True without a gate)"""
+    if gate is None:
+        return True
+    with metrics.timer("motion_gate"):
+        return gate.update(frame)
+
+
+def gate_allows(gate, name, motion):
+    """Whether a due detector should run, or reuse its last result on a static frame"""
+    if gate is None or gate.should_run(name, motion):
+        return True
+    metrics.incr(f"{name}_skipped_static")
+    return False
+
+
+def new_debouncers():
+    return {name: EventDebouncer(END_AFTER, HEARTBEAT) for name in ("objects", "gaze", "pose")}
+
+
+def new_tracker(gate=None):
+    """
+    IoUTracker whose tracks outlive the gate's longest skip: boxes must
+    survive max_staleness without inference plus two keyframe intervals.
+    """
+    if gate is None:
+        return IoUTracker()
+    return IoUTracker(max_age=max(1.0, gate.max_staleness + 2.0 / DETECTOR_RATES["objects"]))
+
+
+def new_gate(sensor_id=SENSOR_ID):
+    gate = MotionGate()
+    metrics.gauge("motion", lambda: {sensor_id: gate.snapshot()})
+    return gate
+
+
+def detect_stage(frames, client, obj, gaze, rates, session_id, stop, tracker=None, gate=None,
+                 pose_frames=None, pose_rates=None, verifier=None, sensor_id=SENSOR_ID):
+    """
+    Run each detector on the newest frame when the rate controller says it is
+    due, annotate the frame and hand state-change events to the sender.
+    Between runs the last results are reused for captions only; with a
+    tracker, object boxes are extrapolated from the last keyframe instead.
+    With a MotionGate, due detectors also skip frames without motion until
+    their results are max_staleness old; tracked boxes stay put meanwhile. With pose_frames, frames due for
+    pose (per pose_rates) are handed to pose_stage instead of run here.
+    With a FaceVerifier, the face found by gaze is offered for identity
+    verification, which only queues a crop when a check is due.
+    """
+    detected_objects, gaze_result = [], None
+    debouncers = new_debouncers()
+    while not stop.is_set():
+        frame = frames.get(timeout=0.5)
+        if frame is None:
+            continue
+
+        # detection; detectors share derived views (RGB, thumbnails) via the context
+        ctx = FrameContext(frame, sensor_id)
+        emitted = []
+        motion = check_motion(gate, ctx)
+        objects_due = rates.due("objects")
+        if objects_due and gate_allows(gate, "objects", motion):
+            start = time.perf_counter()
+            detections = obj.detect(ctx)
+            latency = time.perf_counter() - start
+            rates.record("objects", latency)
+            metrics.observe("objects", latency)
+            if tracker is not None:
+                detections = tracker.update(detections)
+            detected_objects = suspicious_only(detections)
+            emitted += debouncers["objects"].update(detected_objects)
+        elif tracker is not None and not objects_due:
+            # Between keyframes; on a static frame the gate skipped, the
+            # last boxes are kept as they are
+            detected_objects = suspicious_only(tracker.predict())
+        if rates.due("gaze") and gate_allows(gate, "gaze", motion):
+            start = time.perf_counter()
+            gaze_result = gaze.detect(ctx)
+            latency = time.perf_counter() - start
+            rates.record("gaze", latency)
+            metrics.observe("gaze", latency)
+            emitted += debouncers["gaze"].update([gaze_result] if gaze_result else [])
+            if verifier is not None:
+                verifier.offer(ctx)
+        if pose_frames is not None and pose_rates.due("pose") and gate_allows(gate, "pose", motion):
+            # Convert before annotation draws on the frame below
+            ctx.rgb
+            pose_frames.put(ctx)
+
+        publish_results(frame, sensor_id, detected_objects, gaze_result, emitted, client, session_id)
+
+    for d in debouncers.values():
+        for e in d.flush():
+            client.send(normalize(e, session_id=session_id, sensor_id=sensor_id))
+
+
+def pose_stage(frames, client, pose, rates, session_id, stop, sensor_id=SENSOR_ID):
+    """
+    Run the PoseDetector on contexts handed over by the detect stage, in its
+    own thread so its cost does not come out of the object/gaze frame rate.
+    """
+    debouncer = EventDebouncer(END_AFTER, HEARTBEAT)
+    while not stop.is_set():
+        ctx = frames.get(timeout=0.5)
+        if ctx is None:
+            continue
+        start = time.perf_counter()
+        events = pose.detect(ctx)
+        latency = time.perf_counter() - start
+        rates.record("pose", latency)
+        metrics.observe("pose", latency)
+        emitted = debouncer.update(events)
+        for e in emitted:
+            client.send(normalize(e, session_id=session_id, sensor_id=sensor_id))
+        if emitted:
+            metrics.incr("events_emitted", len(emitted))
+
+    for e in debouncer.flush():
+        client.send(normalize(e, session_id=session_id, sensor_id=sensor_id))
+
+
+def batched_detect_stage(manager, client, obj, gazes, rates, session_id, stop, trackers=None, gates=None,
+                         verifiers=None):
+    """
+    Multi-camera detection: the newest frames of all cameras whose object
+    detector is due go through one batched YOLO call, and results are routed
+    back by sensor_id. Gaze still runs per camera on its own schedule.
+
+    Args:
+        gazes: GazeDetector per sensor_id (video mode tracks one stream each)
+        rates: RateController per sensor_id
+        trackers: Optional IoUTracker per sensor_id
+        gates: Optional MotionGate per sensor_id
+        verifiers: Optional FaceVerifier per sensor_id
+    """
+    last_objects = {feed.sensor_id: [] for feed in manager.feeds}
+    last_gaze = {feed.sensor_id: None for feed in manager.feeds}
+    debouncers = {feed.sensor_id: new_debouncers() for feed in manager.feeds}
+    while not stop.is_set():
+        latest = manager.latest()
+        if not latest:
+            time.sleep(0.005)
+            continue
+
+        emitted = {sid: [] for sid, _ in latest}
+        contexts = {sid: FrameContext(frame, sid) for sid, frame in latest}
+        motion = {sid: check_motion(gates and gates[sid], contexts[sid]) for sid, _ in latest}
+        due = {sid for sid, _ in latest if rates[sid].due("objects")}
+        batch = [
+            (sid, contexts[sid]) for sid, _ in latest
+            if sid in due and gate_allows(gates and gates[sid], "objects", motion[sid])
+        ]
+        if batch:
+            start = time.perf_counter()
+            results = obj.detect_batch([frame for _, frame in batch])
+            latency = time.perf_counter() - start
+            metrics.observe("objects_batch", latency)
+            # Charge each camera its share of the batched call
+            per_frame = latency / len(batch)
+            for (sid, _), events in zip(batch, results):
+                if trackers:
+                    events = trackers[sid].update(events)
+                last_objects[sid] = suspicious_only(events)
+                rates[sid].record("objects", per_frame)
+                emitted[sid] += debouncers[sid]["objects"].update(last_objects[sid])
+        for sid, frame in latest:
+            # Static frames the gate skipped keep their last boxes
+            if trackers and sid not in due:
+                last_objects[sid] = suspicious_only(trackers[sid].predict())
+            if rates[sid].due("gaze") and gate_allows(gates and gates[sid], "gaze", motion[sid]):
+                start = time.perf_counter()
+                last_gaze[sid] = gazes[sid].detect(contexts[sid])
+                latency = time.perf_counter() - start
+                rates[sid].record("gaze", latency)
+                metrics.observe("gaze", latency)
+                emitted[sid] += debouncers[sid]["gaze"].update([last_gaze[sid]] if last_gaze[sid] else [])
+                if verifiers:
+                    verifiers[sid].offer(contexts[sid])
+            publish_results(frame, sid, last_objects[sid], last_gaze[sid], emitted[sid], client, session_id)
+
+    for sid, ds in debouncers.items():
+        for d in ds.values():
+            for e in d.flush():
+                client.send(normalize(e, session_id=session_id, sensor_id=sid))
+
+
+def process_detect_stage(ring, pool, client, rates, session_id, stop, tracker=None, gate=None, sensor_id=SENSOR_ID):
+    """
+    Process mode: detectors run in worker processes reading the shared
+    frame ring. For each new frame, every due detector gets the ring
+    sequence number and results are joined per frame with RESULT_TIMEOUT,
+    so one slow detector never holds up the others or the stream. A result
+    that misses the timeout is applied (events, rates) on the first frame
+    after it arrives; until then the detector's last result is shown.
+    """
+    detected_objects, gaze_result = [], None
+    debouncers = new_debouncers()
+    seq = 0
+    while not stop.is_set():
+        latest, frame = ring.latest(seq)
+        if frame is None:
+            time.sleep(0.005)
+            continue
+        if latest > seq + 1 and seq:
+            metrics.incr("frames_dropped", latest - seq - 1)
+        seq = latest
+        # The one copy on this path: annotation and streaming need a private
+        # frame, since the slot stays shared with workers and is reused by
+        # the capture thread
+        frame = frame.copy()
+        pool.check_health()
+
+        motion = check_motion(gate, frame)
+        # Busy or restarting workers are left out before rates.due() so they
+        # do not use up rate slots for runs that never happen
+        due = [name for name, worker in pool.workers.items() if worker.idle() and rates.due(name)]
+        runnable = [name for name in due if gate_allows(gate, name, motion)]
+        sent = pool.submit(seq, runnable)
+        with metrics.timer("result_join"):
+            results = pool.collect(seq, sent, timeout=RESULT_TIMEOUT)
+        for name, (_, latency) in results.items():
+            rates.record(name, latency)
+            metrics.observe(name, latency)
+
+        emitted = []
+        if "objects" in results:
+            detections = results["objects"][0]
+            if tracker is not None:
+                detections = tracker.update(detections)
+            detected_objects = suspicious_only(detections)
+            emitted += debouncers["objects"].update(detected_objects)
+        elif tracker is not None and ("objects" not in due or "objects" in runnable):
+            # Static frames the gate skipped keep their last boxes
+            detected_objects = suspicious_only(tracker.predict())
+        if "gaze" in results:
+            gaze_result = results["gaze"][0]
+            emitted += debouncers["gaze"].update([gaze_result] if gaze_result else [])
+        if "pose" in results:
+            emitted += debouncers["pose"].update(results["pose"][0])
+
+        publish_results(frame, sensor_id, detected_objects, gaze_result, emitted, client, session_id)
+
+    for d in debouncers.values():
+        for e in d.flush():
+            client.send(normalize(e, session_id=session_id, sensor_id=sensor_id))
+
+
+def start_evidence(sensor_ids, stop, root=EVIDENCE_DIR):
+    """
+    Start an EvidenceRecorder per camera and the shared clip writer.
+
+    Returns:
+        (store, stage threads); call store.flush() once the stages have stopped
+    """
+    store = EvidenceStore(root)
+    server.evidence_store = store
+    stages = [start_stage("evidence-writer", store.run, stop)]
+    for sid in sensor_ids:
+        recorder = EvidenceRecorder(server.broadcaster(sid), store, sid, **EVIDENCE_OPTIONS)
+        server.evidence_recorders[sid] = recorder
+        stages.append(start_stage(f"evidence-{sid}", recorder.run, stop))
+    metrics.gauge("evidence_clips", lambda: {"written": store.written, "dropped": store.dropped})
+    logger.info(f"Evidence clips are stored in {store.root}")
+    return store, stages
+
+
+def load_models(sensor_ids, object_backend="torch", imgsz=640, track=False, offline=True, pose_model=None):
+    """
+    Resolve models from the local cache, load them and run warm-up inferences.
+
+    Raises:
+        ModelCacheError: if offline and a model is missing from the cache
+    """
+    start = time.perf_counter()
+    obj = ObjectDetector(backend=object_backend, imgsz=imgsz, track_people=track, offline=offline)
+    obj.warmup()
+    gazes = {sid: GazeDetector(offline=offline) for sid in sensor_ids}
+    for g in gazes.values():
+        g.warmup()
+    pose = None
+    if pose_model:
+        pose = PoseDetector(model=pose_model, offline=offline)
+        pose.warmup()
+    logger.info(f"Models loaded and warmed up in {time.perf_counter() - start:.1f}s")
+    return obj, gazes, pose
+
+
+def load_identity(enrollment, offline=True):
+    """
+    Load the enrollment matrix and start the CPU face embedder process
+    (its torch thread limit must not apply to the YOLO backend here).
+
+    Returns:
+        (store, embedder), or None when nobody is enrolled
+    """
+    store = EnrollmentStore(enrollment)
+    if not len(store):
+        logger.warning(f"No enrollment embeddings at {store.path}; identity verification disabled")
+        return None
+    embedder = EmbedderProcess(offline=offline)
+    server.identity_embedder = embedder
+    return store, embedder
+
+
+def new_verifier(identity, client, session_id, sensor_id=SENSOR_ID, expected_id=None):
+    """FaceVerifier for one camera that sends its events through the client"""
+    def send(event):
+        client.send(normalize(event, session_id=session_id, sensor_id=sensor_id))
+        metrics.incr("events_emitted")
+
+    store, embedder = identity
+    return FaceVerifier(store, embedder, send, expected_id=expected_id, interval=IDENTITY_INTERVAL)
+
+
+def run_vision_loop(stop=None, sources=None, sensor_ids=None, object_backend="torch", imgsz=640, track=False,
+                    offline=True, processes=False, motion_gate=True, pose_model=None, pose_rate=POSE_RATE,
+                    enrollment=None, student_ids=None, evidence_dir=EVIDENCE_DIR):
+    """
+    Run capture and detection as separate stages connected by a latest-frame
+    queue; events are handed to the shared EventClient, which batches and
+    posts them in the background, so end-to-end fps tracks the slowest stage.
+
+    With more than one source, every camera gets its own capture thread and
+    all cameras share one model instance through batched inference.
+
+    With track, objects and people get stable track ids; YOLO only runs on
+    keyframes scheduled by the rate controller and boxes are predicted between.
+
+    With motion_gate, each camera gets a MotionGate and detectors skip
+    static frames (reusing their last results) for up to its max_staleness.
+
+    With pose_model ("lite", "full" or "heavy"), a PoseDetector emits
+    TURNING_AROUND / REACHING events at pose_rate from its own stage
+    (single camera and process mode).
+
+    With enrollment (path of an EnrollmentStore), faces found by gaze are
+    periodically matched against the enrolled students on CPU, emitting
+    IDENTITY_VERIFIED / IDENTITY_MISMATCH / UNKNOWN_FACE; student_ids gives
+    the student expected at each camera, in sensor order.
+
+    With evidence_dir, each camera keeps its last seconds of encoded stream
+    frames in memory, and OBJECT_DETECTED / GAZE_DEVIATION events carry the
+    id of a pre/post clip written there in the background.
+
+    With processes (single camera only), the object and gaze detectors each
+    run in their own worker process on frames shared through a FrameRing,
+    so they use separate cores instead of sharing the GIL. Crashed workers
+    are restarted while the camera keeps running.
+
+    Models are loaded and warmed up before any camera opens; the server's
+    /ready endpoint reports ready only after that.
+    """
+    stop = stop or threading.Event()
+    sources = sources or [0]
+    sensor_ids = sensor_ids or list(range(SENSOR_ID, SENSOR_ID + len(sources)))
+    if len(sensor_ids) != len(sources):
+        raise ValueError(f"Got {len(sensor_ids)} sensor ids for {len(sources)} sources")
+    if processes:
+        if len(sources) > 1:
+            raise ValueError("Process mode supports a single camera source")
+        if enrollment:
+            logger.warning("Identity verification is not supported in process mode; disabling it")
+        run_process_mode(stop, sources[0], object_backend, imgsz, track, offline, motion_gate, pose_model, pose_rate,
+                         evidence_dir, sensor_ids[0])
+        return
+    if pose_model and len(sources) > 1:
+        logger.warning("Pose detection is not supported in multi-camera mode; disabling it")
+        pose_model = None
+    obj, gazes, pose = load_models(sensor_ids, object_backend, imgsz, track, offline, pose_model)
+    identity = load_identity(enrollment, offline) if enrollment else None
+    expected = dict(zip(sensor_ids, student_ids or []))
+    server.mark_ready({"object_backend": object_backend, "imgsz": imgsz, "sensors": sensor_ids, "pose": pose_model,
+                       "identity": identity is not None})
+    session_id = fetch_session_id()
+
+    logger.info("Vision Module Started")
+    logger.info(f"Camera active status: {server.camera_active}")
+
+    client = EventClient(BACKEND_URL, name="vision", observe=lambda s: metrics.observe("event_post", s))
+    metrics.gauge("events_dropped", lambda: client.stats["dropped"])
+    verifiers = {
+        sid: new_verifier(identity, client, session_id, sid, expected.get(sid)) for sid in sensor_ids
+    } if identity else {}
+    if len(sources) > 1:
+        manager = CameraManager(sources, sensor_ids, capture_stage)
+        rates = {sid: RateController(DETECTOR_RATES, cpu_budget=CPU_BUDGET) for sid in sensor_ids}
+        server.rate_controllers.update(rates)
+        metrics.gauge("frames_dropped", lambda: sum(feed.frames.dropped for feed in manager.feeds))
+        gates = {sid: MotionGate() for sid in sensor_ids} if motion_gate else None
+        trackers = {sid: new_tracker(gates and gates[sid]) for sid in sensor_ids} if track else None
+        if gates:
+            metrics.gauge("motion", lambda: {sid: g.snapshot() for sid, g in gates.items()})
+        stages = manager.start(stop) + [
+            start_stage("detect", batched_detect_stage, manager, client, obj, gazes, rates, session_id, stop, trackers,
+                        gates, verifiers),
+        ]
+    else:
+        sensor_id = sensor_ids[0]
+        frames = LatestQueue()
+        metrics.gauge("frames_dropped", lambda: frames.dropped)
+        gaze = gazes[sensor_id]
+        rates = RateController(DETECTOR_RATES, cpu_budget=CPU_BUDGET)
+        server.rate_controllers[sensor_id] = rates
+        pose_frames = pose_rates = None
+        if pose is not None:
+            pose_frames = LatestQueue()
+            pose_rates = RateController({"pose": pose_rate}, cpu_budget=POSE_CPU_BUDGET)
+            server.rate_controllers[f"{sensor_id}:pose"] = pose_rates
+        gate = new_gate(sensor_id) if motion_gate else None
+        stages = [
+            start_stage("capture", capture_stage, frames, stop, parse_source(sources[0])),
+            start_stage("detect", detect_stage, frames, client, obj, gaze, rates, session_id, stop,
+                        new_tracker(gate) if track else None, gate, pose_frames, pose_rates,
+                        verifiers.get(sensor_id), sensor_id),
+        ]
+        if pose is not None:
+            stages.append(start_stage("pose", pose_stage, pose_frames, client, pose, pose_rates, session_id, stop,
+                                      sensor_id))
+    stages += [start_stage(f"identity-{sid}", v.run, stop) for sid, v in verifiers.items()]
+    store = None
+    if evidence_dir:
+        store, evidence_stages = start_evidence(sensor_ids, stop, evidence_dir)
+        stages += evidence_stages
+    for t in stages:
+        t.join()
+    if store is not None:
+        store.flush()
+    if identity is not None:
+        identity[1].close()
+    client.close()
+
+def run_process_mode(stop, source, object_backend="torch", imgsz=640, track=False, offline=True, motion_gate=True,
+                     pose_model=None, pose_rate=POSE_RATE, evidence_dir=EVIDENCE_DIR, sensor_id=SENSOR_ID):
+    """Single camera with each detector in a worker process; see run_vision_loop"""
+    # A camera that renegotiates later still fits: reads of another size are resized into the slot
+    shape = probe_frame_shape(parse_source(source))
+    ring = FrameRing(shape, RING_SLOTS, create=True)
+    logger.info(f"Frame ring: {RING_SLOTS} slots of {shape[1]}x{shape[0]}")
+    factories = {
+        "objects": functools.partial(build_object_detector, object_backend, imgsz, track, offline, shape=shape),
+        "gaze": functools.partial(build_gaze_detector, offline, shape=shape),
+    }
+    if pose_model:
+        factories["pose"] = functools.partial(build_pose_detector, pose_model, offline, shape=shape)
+    pool = WorkerPool(ring, factories)
+    try:
+        pool.start()
+        server.worker_pools[sensor_id] = pool
+        server.mark_ready({"object_backend": object_backend, "imgsz": imgsz, "sensors": [sensor_id],
+                           "processes": list(pool.workers)})
+        session_id = fetch_session_id()
+        logger.info("Vision Module Started (process mode)")
+
+        client = EventClient(BACKEND_URL, name="vision", observe=lambda s: metrics.observe("event_post", s))
+        metrics.gauge("events_dropped", lambda: client.stats["dropped"])
+        # Each detector has its own core, so the budget covers all of them
+        detector_rates = {**DETECTOR_RATES, "pose": pose_rate} if pose_model else DETECTOR_RATES
+        rates = RateController(detector_rates, cpu_budget=CPU_BUDGET * len(pool.workers))
+        server.rate_controllers[sensor_id] = rates
+        gate = new_gate(sensor_id) if motion_gate else None
+        stages = [
+            start_stage("capture", capture_stage, ring, stop, parse_source(source)),
+            start_stage("detect", process_detect_stage, ring, pool, client, rates, session_id, stop,
+                        new_tracker(gate) if track else None, gate, sensor_id),
+        ]
+        store = None
+        if evidence_dir:
+            store, evidence_stages = start_evidence([sensor_id], stop, evidence_dir)
+            stages += evidence_stages
+        for t in stages:
+            t.join()
+        if store is not None:
+            store.flush()
+        client.close()
+    finally:
+        pool.stop()
+        ring.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Vision monitoring module")
+    parser.add_argument(
+        "--sources", nargs="+", default=["0"],
+        help="Camera indices, stream URLs, video files or frame directories; more than one enables multi-camera mode"
+    )
+    parser.add_argument(
+        "--sensor-ids", nargs="+", type=int, default=None,
+        help="Sensor id per source (default: 1..N)"
+    )
+    parser.add_argument(
+        "--object-backend", choices=BACKENDS, default=os.getenv("SAI_OBJECT_BACKEND", "torch"),
+        help="Object detector inference backend (exported models are cached in the model dir)"
+    )
+    parser.add_argument(
+        "--imgsz", type=int, default=int(os.getenv("SAI_OBJECT_IMGSZ", "640")),
+        help="Object detector input size"
+    )
+    parser.add_argument(
+        "--track", action="store_true",
+        help="Track objects and people across frames; run YOLO on keyframes only"
+    )
+    parser.add_argument(
+        "--resolution", default="640x480",
+        help="Capture resolution requested from live cameras, WIDTHxHEIGHT"
+    )
+    parser.add_argument(
+        "--capture-fps", type=int, default=30,
+        help="Capture frame rate requested from live cameras"
+    )
+    parser.add_argument(
+        "--fourcc", default="MJPG",
+        help="Capture pixel format requested from live cameras ('none' keeps the driver default)"
+    )
+    parser.add_argument(
+        "--replay-speed", choices=("native", "fast"), default="native",
+        help="Playback speed for video file and frame directory sources"
+    )
+    parser.add_argument(
+        "--loop", action="store_true",
+        help="Loop video file and frame directory sources instead of stopping at the end"
+    )
+    parser.add_argument(
+        "--pose", action="store_true",
+        help="Detect turning around / reaching with MediaPipe Pose (single camera)"
+    )
+    parser.add_argument(
+        "--pose-model", choices=("lite", "full", "heavy"), default="lite",
+        help="Pose Landmarker variant"
+    )
+    parser.add_argument(
+        "--pose-rate", type=float, default=POSE_RATE,
+        help="Pose detection rate in Hz"
+    )
+    parser.add_argument(
+        "--verify", action="store_true",
+        help="Verify the candidate's identity against enrolled reference photos (see identity.py)"
+    )
+    parser.add_argument(
+        "--enrollment", default=str(ENROLLMENT_PATH),
+        help="Enrollment embeddings file written by identity.py --enroll"
+    )
+    parser.add_argument(
+        "--student-ids", nargs="+", default=None,
+        help="Student expected at each camera, in sensor order"
+    )
+    parser.add_argument(
+        "--evidence-dir", default=EVIDENCE_DIR,
+        help="Directory of the evidence clip store"
+    )
+    parser.add_argument(
+        "--no-evidence", action="store_true",
+        help="Do not record evidence clips around violations"
+    )
+    parser.add_argument(
+        "--no-motion-gate", action="store_true",
+        help="Run detectors on every due frame instead of skipping static ones"
+    )
+    parser.add_argument(
+        "--processes", action="store_true",
+        help="Run each detector in its own worker process (single camera)"
+    )
+    parser.add_argument(
+        "--allow-download", action="store_true",
+        help="Download models missing from the cache instead of failing at startup"
+    )
+    args = parser.parse_args(argv)
+    if args.sensor_ids and len(args.sensor_ids) != len(args.sources):
+        parser.error(f"--sensor-ids needs one id per source ({len(args.sources)}), got {len(args.sensor_ids)}")
+    return args
 
-    if cam:
-        cam.release()
 
 if __name__ == "__main__":
+    args = parse_args()
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    CAMERA_OPTIONS.update(
+        width=width, height=height, fps=args.capture_fps,
+        fourcc=None if args.fourcc.lower() == "none" else args.fourcc,
+    )
+    REPLAY_OPTIONS.update(speed=args.replay_speed, loop=args.loop)
     logger.info("Starting vision server...")
-    t = threading.Thread(target=run_vision_loop, daemon=True)
-    t.start()
-    
-    server.start_server()
+    # Serve /status and /ready (503) while models load and warm up
+    threading.Thread(target=server.start_server, daemon=True).start()
+
+    try:
+        run_vision_loop(
+            sources=args.sources,
+            sensor_ids=args.sensor_ids,
+            object_backend=args.object_backend,
+            imgsz=args.imgsz,
+            track=args.track,
+            offline=not args.allow_download,
+            processes=args.processes,
+            motion_gate=not args.no_motion_gate,
+            pose_model=args.pose_model if args.pose else None,
+            pose_rate=args.pose_rate,
+            enrollment=args.enrollment if args.verify else None,
+            student_ids=args.student_ids,
+            evidence_dir=None if args.no_evidence else args.evidence_dir,
+        )
+    except ModelCacheError as e:
+        logger.error(f"Model cache incomplete, not starting: {e}")
+        sys.exit(1)
+    except RuntimeError as e:
+        logger.error(f"Detector workers failed, not starting: {e}")
+        sys.exit(1)
@@ -0,0 +1,103 @@
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RollingHistogram:
+    """
+    Latency distribution over the most recent samples.
+
+    Recording is a deque append, cheap enough for every frame; percentiles
+    are only computed when a snapshot is requested.
+
+    Args:
+        window: Number of most recent samples kept
+    """
+
+    def __init__(self, window: int = 1024):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def snapshot(self):
+        values = sorted(self.samples)
+        if not values:
+            return {"count": self.count}
+
+        def pct(q):
+            return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+
+
+class Metrics:
+    """
+    Stage timers, counters and gauges for the vision module's /metrics.
+
+    Gauges are callables evaluated at snapshot time, so values owned by
+    other objects (queue drop counts, client counts) need no bookkeeping on
+    the hot path.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.stages: Dict[str, RollingHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        hist = self.stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self.stages.setdefault(stage, RollingHistogram(self.window))
+        hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, fn: Callable[[], float]):
+        self.gauges[name] = fn
+
+    def snapshot(self):
+        gauges = {}
+        for name, fn in list(self.gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception as e:
+                logger.debug(f"Gauge {name} failed: {e}")
+        return {
+            "stages": {name: hist.snapshot() for name, hist in list(self.stages.items())},
+            "counters": dict(self.counters),
+            "gauges": gauges,
+        }
+
+
+# Process-wide registry shared by the pipeline stages and the server
+metrics = Metrics()
@@ -0,0 +1,127 @@
+"""
+Local model cache for the vision module.
+
+The service resolves every model file from MODEL_DIR (SAI_MODEL_DIR) and,
+when offline, fails at startup if one is missing instead of downloading
+during an exam. Populate the cache on a connected machine with:
+
+    python model_cache.py --fetch
+
+Exported object detector backends (see objects.export_model) are cached the
+same way; add --export onnx (or openvino, openvino-int8) and --imgsz to
+match the service's --object-backend and --imgsz.
+"""
+import argparse
+import os
+import shutil
+import urllib.request
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(os.getenv("SAI_MODEL_DIR", Path(__file__).resolve().parent / "models"))
+
+FACE_LANDMARKER = "face_landmarker.task"
+FACE_LANDMARKER_URL = "https://storage.googleapis.com/mediapipe-models/vision/face_landmarker/float16/1/face_landmarker.task"
+YOLO_WEIGHTS = "yolov8n.pt"
+
+# Pose Landmarker variants; "lite" is the default and the one --fetch downloads
+POSE_LANDMARKERS = {
+    "lite": "pose_landmarker_lite.task",
+    "full": "pose_landmarker_full.task",
+    "heavy": "pose_landmarker_heavy.task",
+}
+POSE_LANDMARKER_URL = "https://storage.googleapis.com/mediapipe-models/pose_landmarker/{variant}/float16/1/{name}"
+
+# FaceNet (InceptionResnetV1, VGGFace2) weights for identity verification
+FACENET_WEIGHTS = "20180402-114759-vggface2.pt"
+FACENET_URL = "https://github.com/timesler/facenet-pytorch/releases/download/v2.2.9/20180402-114759-vggface2.pt"
+
+
+class ModelCacheError(Exception):
+    """Raised when a required model is not in the local cache"""
+    pass
+
+
+def resolve(name, model_dir=MODEL_DIR, offline=True):
+    """
+    Find a model file in the cache (or, for older setups, the working directory).
+
+    Returns:
+        Path of the cached file, or the bare name when not offline so the
+        owning library can download it itself
+
+    Raises:
+        ModelCacheError: if offline and the file is not cached
+    """
+    for candidate in (Path(model_dir) / name, Path(name)):
+        if candidate.exists():
+            return str(candidate)
+    if offline:
+        raise ModelCacheError(
+            f"{name} not found in {model_dir}; run 'python model_cache.py --fetch' on a connected machine"
+        )
+    return name
+
+
+def download(url, target):
+    logger.info(f"Downloading {target.name}...")
+    tmp = target.with_suffix(".part")
+    urllib.request.urlretrieve(url, tmp)
+    os.replace(tmp, target)
+
+
+def fetch(model_dir=MODEL_DIR, pose_models=("lite",), facenet=False, exports=(), imgsz=640):
+    """Download every model the vision service needs into the cache, then export YOLO for each backend in exports"""
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    target = model_dir / FACE_LANDMARKER
+    if not target.exists():
+        download(FACE_LANDMARKER_URL, target)
+
+    for variant in pose_models:
+        name = POSE_LANDMARKERS[variant]
+        target = model_dir / name
+        if not target.exists():
+            download(POSE_LANDMARKER_URL.format(variant=f"pose_landmarker_{variant}", name=name), target)
+
+    target = model_dir / FACENET_WEIGHTS
+    if facenet and not target.exists():
+        download(FACENET_URL, target)
+
+    target = model_dir / YOLO_WEIGHTS
+    if not target.exists():
+        logger.info(f"Downloading {YOLO_WEIGHTS}...")
+        from ultralytics.utils.downloads import attempt_download_asset
+        downloaded = attempt_download_asset(YOLO_WEIGHTS)
+        shutil.move(str(downloaded), str(target))
+
+    if exports:
+        from objects import export_model
+        for backend in exports:
+            export_model(YOLO_WEIGHTS, backend, imgsz, model_dir, offline=False)
+
+    logger.info(f"Model cache ready at {model_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage the vision model cache")
+    parser.add_argument("--fetch", action="store_true", help="Download all models into the cache")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--pose-models", nargs="+", choices=list(POSE_LANDMARKERS), default=["lite"])
+    parser.add_argument("--facenet", action="store_true", help="Also fetch FaceNet weights for identity checks")
+    parser.add_argument("--export", nargs="+", choices=["onnx", "openvino", "openvino-int8"], default=[],
+                        help="Also export and cache YOLO for these object detector backends")
+    parser.add_argument("--imgsz", type=int, default=640, help="Input size for --export (match the service's --imgsz)")
+    args = parser.parse_args()
+    if args.fetch:
+        fetch(args.model_dir, args.pose_models, args.facenet, args.export, args.imgsz)
+    else:
+        for name in (FACE_LANDMARKER, YOLO_WEIGHTS, *POSE_LANDMARKERS.values(), FACENET_WEIGHTS):
+            try:
+                print(f"{name}: {resolve(name, args.model_dir)}")
+            except ModelCacheError as e:
+                print(f"{name}: missing ({e})")
@@ -0,0 +1,95 @@
+import time
+import logging
+from typing import Dict, Optional
+import cv2
+import numpy as np
+from frame_context import as_context
+
+logger = logging.getLogger(__name__)
+
+
+class MotionGate:
+    """
+    Cheap motion / scene-change check that lets detectors skip static frames.
+
+    Each frame is shrunk to a small grayscale thumbnail and compared with a
+    running-average background. The thumbnail is split into a grid; motion
+    means some cell has more than cell_fraction of its pixels changed by
+    more than pixel_threshold grey levels. A global scene change (lights,
+    camera moved) trips every cell, so it counts as motion too. The running
+    average absorbs slow lighting drift.
+
+    Detectors ask should_run() after update(): they run on motion, or when
+    their last run is older than max_staleness, so results are never
+    reused for longer than that even in a perfectly still room.
+
+    Args:
+        width: Thumbnail width in pixels (height keeps the aspect ratio)
+        grid: (rows, cols) of motion cells
+        pixel_threshold: Grey-level change counting as a changed pixel
+        cell_fraction: Fraction of changed pixels that makes a cell "moving"
+        max_staleness: Seconds after which a detector runs regardless
+        alpha: Background update rate per frame
+    """
+
+    def __init__(self, width: int = 64, grid=(4, 4), pixel_threshold: int = 20, cell_fraction: float = 0.05,
+                 max_staleness: float = 2.0, alpha: float = 0.1):
+        self.width = width
+        self.grid = grid
+        self.pixel_threshold = pixel_threshold
+        self.cell_fraction = cell_fraction
+        self.max_staleness = max_staleness
+        self.alpha = alpha
+        self.background: Optional[np.ndarray] = None
+        self.last_run: Dict[str, float] = {}
+        self.frames = 0
+        self.motion_frames = 0
+        self.skipped: Dict[str, int] = {}
+
+    def _thumbnail(self, frame):
+        small = as_context(frame).resized(self.width)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (3, 3), 0).astype(np.float32)
+
+    def update(self, frame) -> bool:
+        """
+        Compare frame (BGR array or FrameContext) with the background and fold it in.
+
+        Returns:
+            True if the frame shows motion or a scene change
+        """
+        gray = self._thumbnail(frame)
+        self.frames += 1
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray
+            self.motion_frames += 1
+            return True
+
+        changed = np.abs(gray - self.background) > self.pixel_threshold
+        cv2.accumulateWeighted(gray, self.background, self.alpha)
+
+        rows, cols = self.grid
+        h, w = changed.shape
+        # Per-cell changed fraction via a reshape onto the grid (edges trimmed)
+        cells = changed[: h - h % rows, : w - w % cols].reshape(rows, h // rows, cols, w // cols)
+        motion = bool((cells.mean(axis=(1, 3)) > self.cell_fraction).any())
+        if motion:
+            self.motion_frames += 1
+        return motion
+
+    def should_run(self, name: str, motion: bool, now: Optional[float] = None) -> bool:
+        """Whether detector name should run on this frame; records the run if so"""
+        now = time.monotonic() if now is None else now
+        if motion or now - self.last_run.get(name, float("-inf")) >= self.max_staleness:
+            self.last_run[name] = now
+            return True
+        self.skipped[name] = self.skipped.get(name, 0) + 1
+        return False
+
+    def snapshot(self):
+        return {
+            "frames": self.frames,
+            "motion_ratio": round(self.motion_frames / self.frames, 3) if self.frames else None,
+            "skipped": dict(self.skipped),
+        }
@@ -0,0 +1,56 @@
+import logging
+from typing import Callable, List, Sequence, Tuple
+
+from pipeline import LatestQueue, start_stage
+
+logger = logging.getLogger(__name__)
+
+
+def parse_source(source):
+    """Device indices arrive as strings from the command line"""
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+
+class CameraFeed:
+    """One camera source with its own capture thread and latest-frame queue"""
+
+    def __init__(self, sensor_id: int, source):
+        self.sensor_id = sensor_id
+        self.source = parse_source(source)
+        self.frames = LatestQueue()
+
+
+class CameraManager:
+    """
+    Opens N camera sources in one process and hands out the newest frame from
+    each, so a single model instance can run batched inference across cameras.
+
+    Args:
+        sources: Device indices, file paths or stream URLs
+        sensor_ids: Sensor id reported with each source's events
+        capture: Capture loop run per camera as capture(frames, stop, source)
+    """
+
+    def __init__(self, sources: Sequence, sensor_ids: Sequence[int], capture: Callable):
+        if len(sources) != len(sensor_ids):
+            raise ValueError("Each camera source needs exactly one sensor id")
+        self.feeds = [CameraFeed(sid, src) for sid, src in zip(sensor_ids, sources)]
+        self.capture = capture
+
+    def start(self, stop):
+        threads = []
+        for feed in self.feeds:
+            logger.info(f"Starting camera {feed.source} as sensor {feed.sensor_id}")
+            threads.append(start_stage(f"capture-{feed.sensor_id}", self.capture, feed.frames, stop, feed.source))
+        return threads
+
+    def latest(self) -> List[Tuple[int, object]]:
+        """Return (sensor_id, frame) for every camera that produced a new frame"""
+        out = []
+        for feed in self.feeds:
+            frame = feed.frames.get(timeout=0)
+            if frame is not None:
+                out.append((feed.sensor_id, frame))
+        return out
@@ -1,21 +1,126 @@
+import shutil
+import logging
+from pathlib import Path
+import numpy as np
 from ultralytics import YOLO
+from model_cache import MODEL_DIR, ModelCacheError, resolve
+from frame_context import FrameContext
+
+logger = logging.getLogger(__name__)
+
+# Inference backends: ultralytics runs exported models through ONNX Runtime
+# or OpenVINO on CPU when given the exported file/directory
+BACKENDS = ("torch", "onnx", "openvino", "openvino-int8")
+
+
+def export_model(weights="yolov8n.pt", backend="onnx", imgsz=640, model_dir=MODEL_DIR, offline=False):
+    """
+    Export YOLO weights for a CPU backend once and cache the result in model_dir.
+
+    Returns:
+        Path of the exported model, loadable with YOLO(path)
+
+    Raises:
+        ModelCacheError: if offline and the export is not cached; exporting
+            can reach the network (onnxsim install, INT8 calibration data)
+    """
+    model_dir = Path(model_dir)
+    stem = Path(weights).stem
+    if backend == "onnx":
+        target = model_dir / f"{stem}_{imgsz}.onnx"
+    elif backend in ("openvino", "openvino-int8"):
+        suffix = "_int8" if backend == "openvino-int8" else ""
+        target = model_dir / f"{stem}_{imgsz}{suffix}_openvino_model"
+    else:
+        raise ValueError(f"Unknown export backend: {backend}")
+    if target.exists():
+        return str(target)
+    if offline:
+        raise ModelCacheError(
+            f"{target.name} not found in {model_dir}; run "
+            f"'python model_cache.py --fetch --export {backend} --imgsz {imgsz}' on a connected machine"
+        )
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Exporting {weights} for {backend} at imgsz={imgsz} (one-time)...")
+    model = YOLO(resolve(weights, model_dir, offline))
+    if backend == "onnx":
+        exported = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    else:
+        # INT8 post-training quantization calibrates on ultralytics' default dataset
+        exported = model.export(format="openvino", imgsz=imgsz, dynamic=True, int8=backend == "openvino-int8")
+    shutil.move(str(exported), str(target))
+    logger.info(f"Exported model cached at {target}")
+    return str(target)
+
 
 class ObjectDetector:
-    def __init__(self):
-        self.model = YOLO("yolov8n.pt")
-        self.suspicious = {"cell phone", "book"}
+    def __init__(self, backend="torch", imgsz=640, suspicious=("cell phone", "book"), weights="yolov8n.pt",
+                 model_dir=MODEL_DIR, track_people=False, offline=False):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}")
+        self.backend = backend
+        self.imgsz = imgsz
+        # offline: raise ModelCacheError instead of letting ultralytics download
+        if backend == "torch":
+            self.model = YOLO(resolve(weights, model_dir, offline))
+        else:
+            self.model = YOLO(export_model(weights, backend, imgsz, model_dir, offline), task="detect")
+        self.suspicious = set(suspicious)
+        # With track_people, person boxes are returned as PERSON_DETECTED for the tracker
+        self.track_people = track_people
+
+        # Push the class filter into the model call so NMS and result building
+        # only handle suspicious classes
+        names = self.model.names
+        wanted = self.suspicious | ({"person"} if track_people else set())
+        self.classes = [i for i, name in names.items() if name in wanted]
+        logger.info(f"Object detector: backend={backend} imgsz={imgsz} classes={self.classes}")
+
+    def warmup(self, shape=(480, 640, 3), runs=2):
+        """Build the predictor and run dummy inferences so the first live frame is not slow"""
+        frame = np.zeros(shape, dtype=np.uint8)
+        for _ in range(runs):
+            self._predict(frame)
+
+    def _predict(self, source):
+        # ultralytics letterboxes internally to the smallest stride-aligned
+        # rectangle (640x480 stays 640x480), so contexts pass the raw BGR frame
+        if isinstance(source, FrameContext):
+            source = source.bgr
+        elif isinstance(source, list):
+            source = [f.bgr if isinstance(f, FrameContext) else f for f in source]
+        return self.model(source, imgsz=self.imgsz, classes=self.classes, verbose=False)
+
+    def _events(self, r):
+        events = []
+        for box in r.boxes:
+            label = r.names[int(box.cls)]
+            if label in self.suspicious or (self.track_people and label == "person"):
+                events.append({
+                    "type": "OBJECT_DETECTED" if label in self.suspicious else "PERSON_DETECTED",
+                    "object": label,
+                    "confidence": float(box.conf),
+                    "box": [float(v) for v in box.xyxy[0]]
+                })
+        return events
 
     def detect(self, frame):
-        results = self.model(frame, verbose=False)
+        results = self._predict(frame)
         events = []
 
         for r in results:
-            for box in r.boxes:
-                label = r.names[int(box.cls)]
-                if label in self.suspicious:
-                    events.append({
-                        "type": "OBJECT_DETECTED",
-                        "object": label,
-                        "confidence": float(box.conf)
-                    })
+            events.extend(self._events(r))
         return events
+
+    def detect_batch(self, frames):
+        """
+        Run one batched inference over frames from several cameras.
+
+        Returns:
+            List of event lists, one per input frame, in input order
+        """
+        if not frames:
+            return []
+        results = self._predict(list(frames))
+        return [self._events(r) for r in results]
@@ -0,0 +1,44 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LatestQueue:
+    """
+    Single-slot handoff between pipeline stages. A put replaces any item the
+    consumer has not taken yet, so a slow consumer always gets the newest
+    frame instead of a growing backlog.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._has_item = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the newest item, or None if nothing arrived within timeout"""
+        with self._cond:
+            if not self._has_item and not self._cond.wait_for(lambda: self._has_item, timeout):
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+
+def start_stage(name, target, *args):
+    """Run a pipeline stage in a daemon thread"""
+    t = threading.Thread(target=target, args=args, name=name, daemon=True)
+    t.start()
+    logger.info(f"Pipeline stage started: {name}")
+    return t
@@ -0,0 +1,79 @@
+import logging
+from pathlib import Path
+import mediapipe as mp
+from mediapipe.tasks.python import vision
+from mediapipe.tasks.python.vision import pose_landmarker
+from model_cache import MODEL_DIR, POSE_LANDMARKERS, POSE_LANDMARKER_URL, download, resolve
+import landmarker
+from pose_behaviors import POSE_POINTS, classify_pose
+from frame_context import as_context
+
+logger = logging.getLogger(__name__)
+
+
+class PoseDetector:
+    """
+    Upper-body behavior detector (turning around, reaching) on MediaPipe
+    Pose Landmarker.
+
+    Args:
+        model: Pose Landmarker variant, "lite" (default), "full" or "heavy"
+        running_mode: "video" (default) tracks the body between calls;
+            "image" detects independently on every call
+        offline: Raise ModelCacheError when the model is not cached instead
+            of downloading it
+        turn_ratio, reach_ratio, min_visibility: See classify_pose
+    """
+
+    def __init__(self, model="lite", running_mode="video", model_dir=MODEL_DIR, offline=False,
+                 turn_ratio=0.7, reach_ratio=1.3, min_visibility=0.5):
+        if model not in POSE_LANDMARKERS:
+            raise ValueError(f"model must be one of {list(POSE_LANDMARKERS)}")
+        self.running_mode = running_mode
+        self.turn_ratio = turn_ratio
+        self.reach_ratio = reach_ratio
+        self.min_visibility = min_visibility
+        self._clock = landmarker.VideoClock()
+
+        name = POSE_LANDMARKERS[model]
+        model_path = resolve(name, model_dir, offline)
+        if model_path == name and not Path(name).exists():
+            model_path = str(Path(model_dir) / name)
+            Path(model_dir).mkdir(parents=True, exist_ok=True)
+            download(POSE_LANDMARKER_URL.format(variant=Path(name).stem, name=name), Path(model_path))
+
+        options = pose_landmarker.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO if running_mode == "video" else vision.RunningMode.IMAGE,
+            num_poses=1,
+        )
+        self.pose_landmarker = pose_landmarker.PoseLandmarker.create_from_options(options)
+        logger.info(f"Pose detector initialized ({model} model, {running_mode} mode)")
+
+    def warmup(self, shape=(480, 640, 3), runs=2):
+        """Run dummy inferences so graph setup is paid before the first live frame"""
+        landmarker.warmup(self.detect, shape, runs)
+
+    def detect(self, frame):
+        """
+        Args:
+            frame: BGR frame or FrameContext (shares the RGB conversion)
+
+        Returns:
+            List of behavior events (see classify_pose)
+        """
+        ctx = as_context(frame)
+        if self.running_mode == "video":
+            result = self.pose_landmarker.detect_for_video(ctx.mp_image, self._clock.next_ms())
+        else:
+            result = self.pose_landmarker.detect(ctx.mp_image)
+        if not result.pose_landmarks:
+            return []
+
+        h, w = ctx.shape[:2]
+        landmarks = result.pose_landmarks[0]
+        points = {
+            i: (landmarks[i].x * w, landmarks[i].y * h, landmarks[i].z * w, landmarks[i].visibility or 0.0)
+            for i in POSE_POINTS
+        }
+        return classify_pose(points, self.turn_ratio, self.reach_ratio, self.min_visibility)
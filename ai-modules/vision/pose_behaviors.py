@@ -0,0 +1,60 @@
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pose landmark indices (subject's left/right)
+NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST = 0, 11, 12, 15, 16
+POSE_POINTS = (NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST)
+
+
+def behavior_confidence(ratio, threshold, full):
+    """0.5 at the threshold, rising linearly to 1.0 at full"""
+    return round(min(1.0, 0.5 + 0.5 * (ratio - threshold) / (full - threshold)), 3)
+
+
+def classify_pose(points, turn_ratio=0.7, reach_ratio=1.3, min_visibility=0.5):
+    """
+    Behavior events from upper-body landmarks.
+
+    Args:
+        points: Mapping of landmark index to (x, y, z, visibility), with x, y
+            and z in pixels
+        turn_ratio: Shoulder depth difference over 3D shoulder width, i.e.
+            the sine of torso yaw, that counts as turning around (0.7 is
+            about 45 degrees)
+        reach_ratio: 3D wrist-to-shoulder distance over 3D shoulder width
+            that counts as reaching, when the wrist is also outside the
+            shoulders
+
+    Distances are 3D so that they do not inflate when the torso turns and
+    the shoulders foreshorten in the image.
+
+    Returns:
+        List of TURNING_AROUND / REACHING events
+    """
+    ls, rs = points[LEFT_SHOULDER], points[RIGHT_SHOULDER]
+    if min(ls[3], rs[3]) < min_visibility:
+        return []
+    shoulder_width = float(np.linalg.norm(np.subtract(ls[:3], rs[:3])))
+    if shoulder_width < 1.0:
+        return []
+
+    events = []
+    yaw = abs(ls[2] - rs[2]) / shoulder_width
+    if yaw > turn_ratio:
+        events.append({"type": "TURNING_AROUND", "confidence": behavior_confidence(yaw, turn_ratio, 1.0)})
+
+    mid_x = (ls[0] + rs[0]) / 2
+    for side, shoulder, wrist in (("LEFT", ls, points[LEFT_WRIST]), ("RIGHT", rs, points[RIGHT_WRIST])):
+        if wrist[3] < min_visibility:
+            continue
+        reach = float(np.linalg.norm(np.subtract(wrist[:3], shoulder[:3]))) / shoulder_width
+        outward = abs(wrist[0] - mid_x) > abs(shoulder[0] - mid_x) and (wrist[0] - mid_x) * (shoulder[0] - mid_x) > 0
+        if reach > reach_ratio and outward:
+            events.append({
+                "type": "REACHING",
+                "direction": side,
+                "confidence": behavior_confidence(reach, reach_ratio, 2 * reach_ratio),
+            })
+    return events
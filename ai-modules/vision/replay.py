@@ -0,0 +1,106 @@
+import os
+import time
+import logging
+from pathlib import Path
+import cv2
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def is_replay_source(source):
+    """Video files and frame directories are replayed; device indices and URLs are live"""
+    return isinstance(source, (str, Path)) and os.path.exists(source)
+
+
+class ReplaySource:
+    """
+    Plays a recorded video file or a directory of frames through the Camera
+    interface, for reproducible runs on machines without a camera.
+
+    Args:
+        path: Video file, or directory of images played in name order
+        speed: "native" paces frames at the recording's frame rate, "fast"
+            returns them as quickly as the consumer asks
+        fps: Frame rate for native pacing of a frame directory (video files
+            use their own)
+        loop: Restart from the first frame at the end instead of finishing
+    """
+
+    def __init__(self, path, speed="native", fps=30.0, loop=False):
+        if speed not in ("native", "fast"):
+            raise ValueError("speed must be 'native' or 'fast'")
+        self.path = Path(path)
+        self.speed = speed
+        self.loop = loop
+        self.finished = False
+        self.frames_read = 0
+        self.timestamp = None
+        self.cap = None
+        self.files = None
+        self._index = 0
+        if self.path.is_dir():
+            self.files = sorted(p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+            if not self.files:
+                raise ValueError(f"No frames found in {self.path}")
+            self.fps = fps
+        else:
+            self.cap = cv2.VideoCapture(str(self.path))
+            if not self.cap.isOpened():
+                raise ValueError(f"Cannot open video {self.path}")
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+        self._start = None
+        self._start_frame = 0
+        logger.info(f"Replaying {self.path} at {speed} speed ({self.fps:.1f} fps source)")
+
+    def _next(self):
+        if self.files is not None:
+            if self._index >= len(self.files):
+                return None
+            frame = cv2.imread(str(self.files[self._index]))
+            self._index += 1
+            return frame
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _rewind(self):
+        self._index = 0
+        if self.cap is not None:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def read(self, out=None):
+        if self.finished:
+            return None
+        frame = self._next()
+        if frame is None and self.loop and self.frames_read:
+            self._rewind()
+            self._start = None
+            frame = self._next()
+        if frame is None:
+            self.finished = True
+            logger.info(f"Replay finished after {self.frames_read} frames")
+            return None
+
+        if self.speed == "native":
+            now = time.monotonic()
+            if self._start is None:
+                # (Re)anchor pacing at the first frame of each pass
+                self._start, self._start_frame = now, self.frames_read
+            due = self._start + (self.frames_read - self._start_frame) / self.fps
+            if due > now:
+                time.sleep(due - now)
+        self.frames_read += 1
+        self.timestamp = time.monotonic()
+
+        if out is not None:
+            if frame.shape == out.shape:
+                out[...] = frame
+            else:
+                cv2.resize(frame, (out.shape[1], out.shape[0]), dst=out)
+            return out
+        return frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
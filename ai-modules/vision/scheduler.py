@@ -0,0 +1,84 @@
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DetectorSchedule:
+    """Per-detector rate state"""
+
+    def __init__(self, name: str, target_hz: float):
+        self.name = name
+        self.target_hz = target_hz
+        self.effective_hz = target_hz
+        self.latency = 0.0  # EWMA seconds per call
+        self.last_run = 0.0
+        self.runs = 0
+        self.skipped = 0
+
+
+class RateController:
+    """
+    Schedules each detector at its own target rate against a per-camera CPU
+    budget.
+
+    The budget is the detector time allowed per second of wall clock (0.5 means
+    detectors may use half a core for this camera). When the measured load,
+    sum(latency * target rate), exceeds it, every detector's rate is scaled
+    down proportionally. Frames that arrive between scheduled runs are skipped
+    rather than queued, so overload shows up as a lower rate, never as lag.
+
+    Args:
+        rates: Target rate in Hz per detector name, e.g. {"objects": 5, "gaze": 15}
+        cpu_budget: Detector seconds per wall-clock second for this camera
+        alpha: EWMA smoothing factor for latency
+    """
+
+    def __init__(self, rates: Dict[str, float], cpu_budget: float = 0.8, alpha: float = 0.2):
+        self.cpu_budget = cpu_budget
+        self.alpha = alpha
+        self.detectors = {name: DetectorSchedule(name, hz) for name, hz in rates.items()}
+        self._lock = threading.Lock()
+
+    def _rebalance(self):
+        load = sum(d.latency * d.target_hz for d in self.detectors.values())
+        scale = min(1.0, self.cpu_budget / load) if load > 0 else 1.0
+        for d in self.detectors.values():
+            d.effective_hz = d.target_hz * scale
+
+    def due(self, name: str, now: Optional[float] = None) -> bool:
+        """Return True if the detector should run on this frame; counts a skip otherwise"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            d = self.detectors[name]
+            if d.effective_hz > 0 and now - d.last_run >= 1.0 / d.effective_hz:
+                d.last_run = now
+                return True
+            d.skipped += 1
+            return False
+
+    def record(self, name: str, latency: float):
+        """Feed back the measured latency of a detector run"""
+        with self._lock:
+            d = self.detectors[name]
+            d.latency = latency if d.runs == 0 else (1 - self.alpha) * d.latency + self.alpha * latency
+            d.runs += 1
+            self._rebalance()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "cpu_budget": self.cpu_budget,
+                "detectors": {
+                    d.name: {
+                        "target_hz": d.target_hz,
+                        "effective_hz": round(d.effective_hz, 2),
+                        "latency_ms": round(d.latency * 1000, 2),
+                        "runs": d.runs,
+                        "skipped": d.skipped,
+                    }
+                    for d in self.detectors.values()
+                },
+            }
@@ -1,9 +1,12 @@
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-import cv2
+import re
 import threading
 import time
+from typing import Optional
+from broadcast import FrameBroadcaster, TIERS, DEFAULT_TIER
+from metrics import metrics
 
 app = FastAPI()
 
@@ -17,32 +20,79 @@ app.add_middleware(
 
 # Global flag to control camera
 camera_active = True
-output_frame = None
 lock = threading.Lock()
 
-def generate():
-    global output_frame, lock, camera_active
-    while True:
-        if not camera_active:
-            # Yield a placeholder frame or just silence?
-            # For MJPEG, it's better to verify connection is kept open or yield a static "OFF" frame.
-            # For simplicity, we'll just yield nothing and sleep, relying on frontend to handle the visual.
-            # OR we can generate a black frame.
-            time.sleep(0.5)
-            continue
+# FrameBroadcaster per sensor_id; streams without a sensor_id follow the
+# primary (first) sensor
+broadcasters = {}
+primary_sensor = None
 
+# RateController per sensor_id, registered by the vision loop
+rate_controllers = {}
+
+# WorkerPool per sensor_id in process mode
+worker_pools = {}
+
+# EvidenceRecorder per sensor_id and the EvidenceStore they write to
+evidence_recorders = {}
+evidence_store = None
+
+# EmbedderProcess behind identity verification, if enabled
+identity_embedder = None
+
+# Open /video_feed connections per tier
+stream_clients = dict.fromkeys(TIERS, 0)
+metrics.gauge("stream_clients", lambda: dict(stream_clients))
+
+# Set once models are loaded and warmed up
+ready = False
+ready_info = {}
+
+def mark_ready(info=None):
+    global ready, ready_info
+    ready_info = info or {}
+    ready = True
+
+def broadcaster(sensor_id):
+    with lock:
+        if sensor_id not in broadcasters:
+            broadcasters[sensor_id] = FrameBroadcaster()
+        return broadcasters[sensor_id]
+
+def publish_frame(sensor_id, frame):
+    global primary_sensor
+    with lock:
+        if primary_sensor is None:
+            primary_sensor = sensor_id
+    broadcaster(sensor_id).publish(frame)
+
+def generate(sensor_id=None, profile=DEFAULT_TIER, max_fps=None):
+    # Until the first camera publishes there is no primary sensor to follow
+    while sensor_id is None and primary_sensor is None:
+        time.sleep(0.5)
+    target = primary_sensor if sensor_id is None else sensor_id
+    with lock:
+        stream_clients[profile] += 1
+    try:
+        yield from broadcaster(target).stream(profile, max_fps, active=lambda: camera_active)
+    finally:
+        # Runs when the client disconnects and the response closes the generator
         with lock:
-            if output_frame is None:
-                continue
-            (flag, encodedImage) = cv2.imencode(".jpg", output_frame)
-            if not flag:
-                continue
-        yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + 
-               bytearray(encodedImage) + b'\r\n')
+            stream_clients[profile] -= 1
 
 @app.get("/video_feed")
-def video_feed():
-    return StreamingResponse(generate(), media_type="multipart/x-mixed-replace; boundary=frame")
+def video_feed(
+    sensor_id: Optional[int] = None,
+    profile: str = Query(DEFAULT_TIER, description="Preview tier: thumbnail, standard or full"),
+    fps: Optional[float] = Query(None, gt=0, description="Lower the tier's frame rate cap"),
+):
+    if profile not in TIERS:
+        raise HTTPException(status_code=400, detail=f"profile must be one of {list(TIERS)}")
+    return StreamingResponse(generate(sensor_id, profile, fps), media_type="multipart/x-mixed-replace; boundary=frame")
+
+@app.get("/video_feed/profiles")
+def video_feed_profiles():
+    return {name: tier._asdict() for name, tier in TIERS.items()}
 
 @app.post("/camera/start")
 def start_camera():
@@ -58,7 +108,46 @@ def stop_camera():
 
 @app.get("/status")
 def status():
-    return {"status": "running", "camera_active": camera_active, "captions_active": captions_active}
+    return {
+        "status": "running",
+        "camera_active": camera_active,
+        "captions_active": captions_active,
+        "inference": {sensor_id: rc.snapshot() for sensor_id, rc in rate_controllers.items()},
+        "workers": {sensor_id: pool.snapshot() for sensor_id, pool in worker_pools.items()},
+        "evidence": {sensor_id: rec.snapshot() for sensor_id, rec in evidence_recorders.items()},
+        "identity": identity_embedder.snapshot() if identity_embedder is not None else None,
+    }
+
+@app.get("/evidence/{clip_id}")
+def evidence_clip(clip_id: str):
+    """Manifest of an evidence clip: event, sensor and frame hashes in order"""
+    manifest = None
+    if evidence_store is not None and re.fullmatch(r"[0-9a-f-]+", clip_id):
+        manifest = evidence_store.manifest(clip_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Unknown clip")
+    return manifest
+
+@app.get("/evidence/frames/{digest}")
+def evidence_frame(digest: str):
+    """One JPEG frame of an evidence clip, by its sha256"""
+    if evidence_store is None or not re.fullmatch(r"[0-9a-f]{64}", digest):
+        raise HTTPException(status_code=404, detail="Unknown frame")
+    path = evidence_store.blob_path(digest)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Unknown frame")
+    return FileResponse(path, media_type="image/jpeg")
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Rolling per-stage latency histograms, frame/event counters and stream clients"""
+    return metrics.snapshot()
+
+@app.get("/ready")
+def readiness():
+    if not ready:
+        return JSONResponse(status_code=503, content={"ready": False})
+    return {"ready": True, **ready_info}
 
 # Global flag to control captions
 captions_active = True
@@ -0,0 +1,110 @@
+import itertools
+import time
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def iou(a, b):
+    """Intersection over union of two xyxy boxes"""
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class Track:
+    """A tracked object with a constant-velocity box model"""
+
+    def __init__(self, track_id: int, event: dict, now: float):
+        self.track_id = track_id
+        self.event = event
+        self.box = list(event["box"])
+        self.velocity = [0.0, 0.0, 0.0, 0.0]  # px/s per box coordinate
+        self.hits = 1
+        self.updated_at = now
+
+    def predicted_box(self, now: float):
+        dt = now - self.updated_at
+        return [c + v * dt for c, v in zip(self.box, self.velocity)]
+
+    def update(self, event: dict, now: float, smoothing: float = 0.5):
+        dt = now - self.updated_at
+        if dt > 0:
+            measured = [(n - o) / dt for n, o in zip(event["box"], self.box)]
+            self.velocity = [smoothing * m + (1 - smoothing) * v for m, v in zip(measured, self.velocity)]
+        self.event = event
+        self.box = list(event["box"])
+        self.hits += 1
+        self.updated_at = now
+
+
+class IoUTracker:
+    """
+    Lightweight IoU tracker giving detections stable track ids.
+
+    update() runs on keyframes with fresh detector output and matches boxes
+    to existing tracks greedily by IoU (same label only). predict() is cheap
+    and extrapolates every live track with its constant-velocity model, so
+    the expensive detector only has to run on keyframes.
+
+    Args:
+        iou_threshold: Minimum IoU between a detection and a track's predicted box
+        max_age: Seconds a track survives without a matching detection
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: float = 1.0):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+
+    def update(self, detections: List[dict], now: Optional[float] = None) -> List[dict]:
+        """
+        Returns:
+            The detections with a "track_id" attached
+        """
+        now = time.monotonic() if now is None else now
+        predicted = [t.predicted_box(now) for t in self.tracks]
+        pairs = sorted(
+            (
+                (iou(d["box"], box), di, ti)
+                for di, d in enumerate(detections)
+                for ti, (t, box) in enumerate(zip(self.tracks, predicted))
+                if d.get("object") == t.event.get("object")
+            ),
+            reverse=True,
+        )
+
+        matched_d, matched_t = {}, set()
+        for score, di, ti in pairs:
+            if score < self.iou_threshold:
+                break
+            if di in matched_d or ti in matched_t:
+                continue
+            matched_d[di] = ti
+            matched_t.add(ti)
+
+        out = []
+        for di, d in enumerate(detections):
+            if di in matched_d:
+                track = self.tracks[matched_d[di]]
+                track.update(d, now)
+            else:
+                track = Track(next(self._ids), d, now)
+                self.tracks.append(track)
+            out.append({**d, "track_id": track.track_id})
+
+        self.tracks = [t for t in self.tracks if now - t.updated_at <= self.max_age]
+        return out
+
+    def predict(self, now: Optional[float] = None) -> List[dict]:
+        """Live tracks as detections with extrapolated boxes (no inference)"""
+        now = time.monotonic() if now is None else now
+        return [
+            {**t.event, "box": t.predicted_box(now), "track_id": t.track_id}
+            for t in self.tracks
+            if now - t.updated_at <= self.max_age
+        ]
@@ -0,0 +1,294 @@
+import multiprocessing as mp
+import queue
+import time
+import logging
+from typing import Callable, Dict, Iterable, List
+
+from frame_ring import FrameRing
+
+logger = logging.getLogger(__name__)
+
+# Sequence number of the message a worker sends once its detector is loaded
+READY = 0
+
+
+def build_object_detector(backend="torch", imgsz=640, track_people=False, offline=True, shape=(480, 640, 3)):
+    from objects import ObjectDetector
+    detector = ObjectDetector(backend=backend, imgsz=imgsz, track_people=track_people, offline=offline)
+    detector.warmup(shape)
+    return detector
+
+
+def build_gaze_detector(offline=True, shape=(480, 640, 3)):
+    from gaze import GazeDetector
+    detector = GazeDetector(offline=offline)
+    detector.warmup(shape)
+    return detector
+
+
+def build_pose_detector(model="lite", offline=True, shape=(480, 640, 3)):
+    from pose import PoseDetector
+    detector = PoseDetector(model=model, offline=offline)
+    detector.warmup(shape)
+    return detector
+
+
+def worker_main(name, factory, ring_spec, requests, results):
+    """
+    Detector process: load the detector, then run it on each requested ring
+    sequence and report (name, seq, result, latency, error).
+    """
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s - worker[{name}] - %(levelname)s - %(message)s")
+    try:
+        detector = factory()
+        ring = FrameRing(*ring_spec)
+    except Exception as e:
+        results.put((name, READY, None, 0.0, f"{type(e).__name__}: {e}"))
+        return
+    results.put((name, READY, None, 0.0, None))
+
+    while True:
+        seq = requests.get()
+        if seq is None:
+            break
+        frame = ring.get(seq)
+        if frame is None:
+            results.put((name, seq, None, 0.0, "frame overwritten before it was read"))
+            continue
+        start = time.perf_counter()
+        try:
+            result, error = detector.detect(frame), None
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        latency = time.perf_counter() - start
+        if error is None and not ring.valid(seq):
+            # The capture process lapped us mid-inference; the frame may be torn
+            result, error = None, "frame overwritten during inference"
+        results.put((name, seq, result, latency, error))
+    ring.close()
+
+
+class DetectorWorker:
+    """One detector process and its request queue, with health counters"""
+
+    def __init__(self, name: str, factory: Callable):
+        self.name = name
+        self.factory = factory
+        self.process = None
+        self.requests = None
+        self.inflight = None  # seq being processed, if any
+        self.latency = 0.0  # EWMA seconds per detect
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.restart_at = 0.0
+        self.last_error = None
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def idle(self) -> bool:
+        """Alive with no frame in flight, i.e. submit() would send it a frame"""
+        return self.inflight is None and self.alive()
+
+    def queue_depth(self) -> int:
+        try:
+            return self.requests.qsize()
+        except NotImplementedError:
+            # macOS has no sem_getvalue
+            return int(self.inflight is not None)
+
+
+class WorkerPool:
+    """
+    Runs each detector in a dedicated process reading frames from a FrameRing.
+
+    The main loop submits ring sequence numbers (not frames) to every due
+    detector and joins the results per sequence with a timeout, so a slow
+    detector cannot stall the others: the frame goes out without it, and
+    its result is returned by the next collect() once it arrives. A worker is only sent a
+    new frame once it has answered the previous one, so queues never back
+    up. Dead workers are restarted with exponential backoff while the camera
+    keeps running in the parent process.
+
+    Args:
+        ring: The parent's FrameRing (create=True)
+        factories: Picklable zero-argument callable per detector name that
+            builds the detector in the worker, e.g.
+            functools.partial(build_gaze_detector, offline=True)
+        ready_timeout: Seconds to wait for every worker to load its model
+        backoff_base: First restart delay in seconds, doubled per restart
+        backoff_max: Restart delay cap in seconds
+    """
+
+    def __init__(self, ring: FrameRing, factories: Dict[str, Callable], ready_timeout: float = 120.0,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0, alpha: float = 0.2):
+        self.ring_spec = (ring.shape, ring.slots, ring.name)
+        self.workers = {name: DetectorWorker(name, factory) for name, factory in factories.items()}
+        self.ready_timeout = ready_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.alpha = alpha
+        # spawn: detector libraries start threads that do not survive fork
+        self._ctx = mp.get_context("spawn")
+        self.results = self._ctx.Queue()
+        # Most recent result per detector, whichever frame it belonged to
+        self.last = {name: None for name in self.workers}
+
+    def _launch(self, worker: DetectorWorker):
+        worker.requests = self._ctx.Queue()
+        worker.inflight = None
+        worker.process = self._ctx.Process(
+            target=worker_main,
+            args=(worker.name, worker.factory, self.ring_spec, worker.requests, self.results),
+            name=f"detector-{worker.name}",
+            daemon=True,
+        )
+        worker.process.start()
+        logger.info(f"Detector worker {worker.name} started (PID {worker.process.pid})")
+
+    def start(self):
+        """
+        Start all workers and wait until each has loaded its detector.
+
+        Raises:
+            RuntimeError: if a worker fails to load or does not report ready in time
+        """
+        for worker in self.workers.values():
+            self._launch(worker)
+        pending = set(self.workers)
+        deadline = time.monotonic() + self.ready_timeout
+        while pending:
+            try:
+                name, seq, _, _, error = self.results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.stop()
+                raise RuntimeError(f"Detector workers not ready after {self.ready_timeout}s: {sorted(pending)}")
+            if seq != READY:
+                continue
+            if error:
+                self.stop()
+                raise RuntimeError(f"Detector worker {name} failed to start: {error}")
+            pending.discard(name)
+        logger.info(f"Detector workers ready: {list(self.workers)}")
+
+    def check_health(self, now=None):
+        """Restart dead workers once their backoff delay has passed"""
+        now = time.monotonic() if now is None else now
+        for worker in self.workers.values():
+            if worker.alive():
+                continue
+            if worker.restart_at == 0.0:
+                delay = min(self.backoff_max, self.backoff_base * (2 ** worker.restarts))
+                worker.restart_at = now + delay
+                logger.warning(
+                    f"Detector worker {worker.name} exited with code {worker.process.exitcode}, "
+                    f"restarting in {delay:.1f}s"
+                )
+            elif now >= worker.restart_at:
+                worker.restarts += 1
+                worker.restart_at = 0.0
+                self._launch(worker)
+
+    def submit(self, seq: int, names: Iterable[str]) -> List[str]:
+        """
+        Send ring sequence seq to the named detectors that are alive and idle.
+
+        Returns:
+            Names of the detectors the frame was sent to
+        """
+        sent = []
+        for name in names:
+            worker = self.workers[name]
+            if not worker.idle():
+                continue
+            worker.inflight = seq
+            worker.requests.put(seq)
+            sent.append(name)
+        return sent
+
+    def _record(self, name, seq, result, latency, error):
+        worker = self.workers.get(name)
+        if worker is None or seq == READY:
+            # A restarted worker's ready message; nothing to join
+            return
+        if worker.inflight == seq:
+            worker.inflight = None
+        if error:
+            worker.errors += 1
+            worker.last_error = error
+            return
+        worker.completed += 1
+        worker.latency = latency if worker.completed == 1 else (
+            self.alpha * latency + (1 - self.alpha) * worker.latency
+        )
+        self.last[name] = result
+
+    def collect(self, seq: int, names: Iterable[str], timeout: float = 0.2) -> Dict[str, tuple]:
+        """
+        Join the results for sequence seq from the named detectors.
+
+        Every call drains the results queue, even with no names, so late
+        results for older sequences are never left behind: they free their
+        worker for the next frame and are returned alongside the ones for
+        seq. Detectors that miss the timeout are counted; their result is
+        returned by a later call.
+
+        Returns:
+            {name: (result, latency)} of the newest error-free result per
+            detector received during this call, for seq or an older frame
+        """
+        pending = set(names)
+        out = {}
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    message = self.results.get(timeout=remaining)
+                else:
+                    message = self.results.get_nowait()
+            except queue.Empty:
+                break
+            name, rseq, result, latency, error = message
+            self._record(name, rseq, result, latency, error)
+            if rseq == READY or name not in self.workers:
+                continue
+            if rseq == seq:
+                pending.discard(name)
+            if not error:
+                out[name] = (result, latency)
+        for name in pending:
+            self.workers[name].timeouts += 1
+        return out
+
+    def snapshot(self):
+        return {
+            name: {
+                "alive": w.alive(),
+                "pid": w.process.pid if w.process else None,
+                "queue_depth": w.queue_depth() if w.requests else 0,
+                "busy": w.inflight is not None,
+                "latency_ms": round(w.latency * 1000, 2),
+                "completed": w.completed,
+                "errors": w.errors,
+                "timeouts": w.timeouts,
+                "restarts": w.restarts,
+                "last_error": w.last_error,
+            }
+            for name, w in self.workers.items()
+        }
+
+    def stop(self, timeout: float = 5.0):
+        for worker in self.workers.values():
+            if worker.alive():
+                worker.requests.put(None)
+        for worker in self.workers.values():
+            if worker.process is None:
+                continue
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
@@ -11,6 +11,10 @@ class Event(Base):
     event_type = Column(String)
     confidence = Column(Float)
     timestamp = Column(Float, nullable=True)
+    duration = Column(Float, nullable=True)
+    peak_confidence = Column(Float, nullable=True)
+    track_id = Column(Integer, nullable=True)
+    evidence = Column(String, nullable=True)
     created_at = Column(TIMESTAMP, default=datetime.datetime.utcnow)
 
     def to_dict(self):
@@ -22,6 +26,10 @@ class Event(Base):
             "event_type": self.event_type,
             "confidence": self.confidence,
             "timestamp": self.timestamp,
+            "duration": self.duration,
+            "peak_confidence": self.peak_confidence,
+            "track_id": self.track_id,
+            "evidence": self.evidence,
             "created_at": self.created_at
         }
 
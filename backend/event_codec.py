@@ -0,0 +1,177 @@
+"""
+Compact binary wire format for AI module events.
+
+Layout (little-endian):
+    header   magic "SAIE", version u8, string count u16, record count u32
+    strings  per entry: length u8 + utf-8 bytes (sources, event types and
+             evidence clip ids)
+    records  fixed 40-byte rows, see RECORD_DTYPE
+
+Sources, event types and evidence clip ids are dictionary-encoded as indices
+into the string table, so a batch only carries each name once. Missing
+optional values (timestamp, duration, peak_confidence) are sent as NaN, a
+missing track_id or evidence as -1.
+"""
+import math
+import struct
+from typing import Dict, List
+
+import numpy as np
+
+CONTENT_TYPE = "application/x-sai-events"
+
+MAGIC = b"SAIE"
+VERSION = 4
+HEADER = struct.Struct("<4sBHI")
+RECORD = struct.Struct("<HHiifdffii")
+
+# Matches EventBase.evidence
+MAX_EVIDENCE_LENGTH = 64
+
+RECORD_DTYPE = np.dtype([
+    ("source", "<u2"),
+    ("event_type", "<u2"),
+    ("session_id", "<i4"),
+    ("sensor_id", "<i4"),
+    ("confidence", "<f4"),
+    ("timestamp", "<f8"),
+    ("duration", "<f4"),
+    ("peak_confidence", "<f4"),
+    ("track_id", "<i4"),
+    ("evidence", "<i4"),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+class EventDecodeError(ValueError):
+    """Raised when a binary event batch is malformed or fails validation"""
+    pass
+
+
+def encode_events(events: List[dict]) -> bytes:
+    """
+    Encode normalized event dicts (see vision/events.py normalize) to bytes.
+    """
+    strings: Dict[str, int] = {}
+
+    def index(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    def optional(value):
+        return math.nan if value is None else value
+
+    records = bytearray()
+    for e in events:
+        records += RECORD.pack(
+            index(e["source"]),
+            index(e["event_type"]),
+            e["session_id"],
+            e["sensor_id"],
+            e["confidence"],
+            optional(e.get("timestamp")),
+            optional(e.get("duration")),
+            optional(e.get("peak_confidence")),
+            -1 if e.get("track_id") is None else e["track_id"],
+            -1 if e.get("evidence") is None else index(e["evidence"]),
+        )
+
+    table = bytearray()
+    for value in strings:
+        raw = value.encode("utf-8")
+        if len(raw) > 255:
+            raise ValueError(f"String too long for event table: {value[:32]}...")
+        table.append(len(raw))
+        table += raw
+
+    return HEADER.pack(MAGIC, VERSION, len(strings), len(events)) + bytes(table) + bytes(records)
+
+
+def decode_events(data: bytes) -> List[dict]:
+    """
+    Decode and validate a binary event batch in one vectorized pass.
+
+    Returns:
+        List of event dicts with the same fields as EventCreate
+
+    Raises:
+        EventDecodeError: if the payload is malformed or any record is invalid
+    """
+    if len(data) < HEADER.size:
+        raise EventDecodeError("Payload shorter than header")
+    magic, version, n_strings, n_records = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise EventDecodeError("Unsupported event payload format")
+
+    offset = HEADER.size
+    strings = []
+    for _ in range(n_strings):
+        if offset >= len(data):
+            raise EventDecodeError("Truncated string table")
+        length = data[offset]
+        offset += 1
+        try:
+            strings.append(data[offset:offset + length].decode("utf-8"))
+        except UnicodeDecodeError as e:
+            raise EventDecodeError(f"Invalid string table entry: {e}")
+        offset += length
+
+    if len(data) - offset != n_records * RECORD_DTYPE.itemsize:
+        raise EventDecodeError("Record section size does not match record count")
+    records = np.frombuffer(data, dtype=RECORD_DTYPE, count=n_records, offset=offset)
+
+    evidence = records["evidence"]
+    # Only table entries referenced as evidence are held to the schema's clip id length
+    long_strings = np.array([len(s) > MAX_EVIDENCE_LENGTH for s in strings] + [False], dtype=bool)
+    confidence = records["confidence"].astype(np.float64)
+    duration = records["duration"].astype(np.float64)
+    peak = records["peak_confidence"].astype(np.float64)
+    invalid = (
+        (records["source"] >= n_strings)
+        | (records["event_type"] >= n_strings)
+        | ~(confidence >= 0.0)
+        | ~(confidence <= 1.0)
+        | (duration < 0.0)
+        | (peak < 0.0)
+        | (peak > 1.0)
+        | (records["track_id"] < -1)
+        | (evidence < -1)
+        | (evidence >= n_strings)
+        | long_strings[np.where((evidence >= 0) & (evidence < n_strings), evidence, n_strings)]
+    )
+    if invalid.any():
+        bad = np.flatnonzero(invalid)
+        raise EventDecodeError(f"{len(bad)} invalid record(s), first at index {int(bad[0])}")
+
+    # NaN != NaN marks a missing optional value
+    confidence = np.round(confidence, 6).tolist()
+    duration = np.round(duration, 3).tolist()
+    peak = np.round(peak, 6).tolist()
+    timestamps = records["timestamp"].tolist()
+    return [
+        {
+            "source": strings[src],
+            "session_id": session_id,
+            "sensor_id": sensor_id,
+            "event_type": strings[etype],
+            "confidence": conf,
+            "timestamp": None if ts != ts else ts,
+            "duration": None if dur != dur else dur,
+            "peak_confidence": None if pk != pk else pk,
+            "track_id": None if track == -1 else track,
+            "evidence": None if clip == -1 else strings[clip],
+        }
+        for src, etype, session_id, sensor_id, conf, ts, dur, pk, track, clip in zip(
+            records["source"].tolist(),
+            records["event_type"].tolist(),
+            records["session_id"].tolist(),
+            records["sensor_id"].tolist(),
+            confidence,
+            timestamps,
+            duration,
+            peak,
+            records["track_id"].tolist(),
+            evidence.tolist(),
+        )
+    ]
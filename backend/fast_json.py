@@ -0,0 +1,77 @@
+import json
+import datetime
+import logging
+from typing import Any, Iterable, List, Sequence, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; the stdlib encoder keeps the API working without it
+    orjson = None
+    logger.warning("orjson is not installed; fast list responses use the slower stdlib json encoder")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Encode a payload to JSON bytes, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> Tuple[List[Any], List[str]]:
+    """
+    Map the fields of a response schema onto ORM columns.
+
+    Returns:
+        Tuple of (columns, field_names) in schema field order
+    """
+    names = list(schema.model_fields)
+    return [getattr(model, name) for name in names], names
+
+
+def _bool_fields(schema: Type[BaseModel], names: Sequence[str]) -> List[int]:
+    # Integer flag columns (e.g. User.is_active) are declared as bool in the schemas
+    return [i for i, name in enumerate(names) if schema.model_fields[name].annotation is bool]
+
+
+def rows_to_dicts(schema: Type[BaseModel], names: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[dict]:
+    """
+    Zip column tuples into plain dicts matching the response schema.
+    """
+    bool_idx = _bool_fields(schema, names)
+    out = []
+    for row in rows:
+        if bool_idx:
+            row = list(row)
+            for i in bool_idx:
+                if row[i] is not None:
+                    row[i] = bool(row[i])
+        out.append(dict(zip(names, row)))
+    return out
+
+
+def fast_list_response(query, model, schema: Type[BaseModel]) -> Response:
+    """
+    Run a list query selecting only the schema's columns and encode the rows
+    directly, skipping per-row Pydantic validation.
+
+    Args:
+        query: SQLAlchemy query over `model` with filters/order/limit applied
+        model: ORM class the columns are read from
+        schema: Response schema describing the output fields
+    """
+    columns, names = schema_columns(model, schema)
+    rows = query.with_entities(*columns).all()
+    return Response(content=dumps(rows_to_dicts(schema, names, rows)), media_type="application/json")
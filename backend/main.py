@@ -1,10 +1,12 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
+from pydantic import TypeAdapter, ValidationError
 from typing import List, Optional
 import logging
+import os
 
 # Adjust imports to match package structure
-from backend.database.database import SessionLocal, engine, get_db
+from backend.database.database import SessionLocal, get_db, init_db
 from backend.database import models
 from backend.schemas import (
     EventCreate, Event, AlertResponse, SessionStats, 
@@ -13,6 +15,8 @@ from backend.schemas import (
 )
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from backend.auth_utils import get_password_hash, verify_password, create_access_token, verify_token
+from backend.fast_json import fast_list_response
+from backend import event_codec
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -29,8 +33,9 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# Create tables, unless the launcher already did it once before forking workers
+if os.getenv("SAI_SCHEMA_READY") != "1":
+    init_db()
 
 app = FastAPI(
     title="Scalable AI Backend",
@@ -94,62 +99,118 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 def read_users_me(current_user: models.User = Depends(get_current_user)):
     return current_user
 
+_event_list_adapter = TypeAdapter(List[EventCreate])
+
+
+async def read_event_payload(request: Request) -> List[dict]:
+    """
+    Parse an event body as JSON (one event or a list) or, when the client sends
+    Content-Type: application/x-sai-events, as a binary batch (backend/event_codec.py).
+    """
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith(event_codec.CONTENT_TYPE):
+        try:
+            return event_codec.decode_events(body)
+        except event_codec.EventDecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    if body.lstrip()[:1] != b"[":
+        body = b"[" + body + b"]"
+    try:
+        return [e.model_dump() for e in _event_list_adapter.validate_json(body)]
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+
+def resolve_session_id(db: Session, session_id: Optional[int], cache: dict) -> Optional[int]:
+    # If session_id is 1 (placeholder) or not provided, try to find the actual active exam
+    if session_id != 1 and session_id:
+        return session_id
+    if "active" not in cache:
+        active_exam = db.query(models.Examination).filter(models.Examination.is_active == 1).first()
+        cache["active"] = active_exam.id if active_exam else None
+    return cache["active"] or session_id
+
+
 @app.post("/events", response_model=dict)
-def receive_event(event: EventCreate, db: Session = Depends(get_db)):
+def receive_event(events: List[dict] = Depends(read_event_payload), db: Session = Depends(get_db)):
     """
     Receive an event from AI modules and store it.
-    Validates using Pydantic schema.
+    Validates using Pydantic schema (JSON) or the binary codec.
     """
+    if len(events) != 1:
+        raise HTTPException(status_code=400, detail="Expected exactly one event, use /events/batch for batches")
+    event = events[0]
     try:
-        # If session_id is 1 (placeholder) or not provided, try to find the actual active exam
-        effective_session_id = event.session_id
-        if effective_session_id == 1 or not effective_session_id:
-            active_exam = db.query(models.Examination).filter(models.Examination.is_active == 1).first()
-            if active_exam:
-                effective_session_id = active_exam.id
-
         # Create event record
-        db_event = models.Event(
-            source=event.source,
-            session_id=effective_session_id,
-            sensor_id=event.sensor_id,
-            event_type=event.event_type,
-            confidence=event.confidence,
-            timestamp=event.timestamp
-        )
+        db_event = models.Event(**{**event, "session_id": resolve_session_id(db, event["session_id"], {})})
         db.add(db_event)
         db.commit()
         db.refresh(db_event)
         
-        logger.info(f"Event stored: {event.event_type} from {event.source} (conf: {event.confidence:.2f})")
+        logger.info(f"Event stored: {event['event_type']} from {event['source']} (conf: {event['confidence']:.2f})")
         
         return {
             "status": "stored",
             "event_id": db_event.event_id,
-            "timestamp": event.timestamp
+            "timestamp": event["timestamp"]
         }
     except Exception as e:
+        # The payload was validated by read_event_payload (422); anything
+        # failing here is storage, which the client should retry
         logger.error(f"Error storing event: {e}")
         db.rollback()
-        raise HTTPException(status_code=400, detail=f"Error storing event: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Error storing event: {str(e)}")
+
+@app.post("/events/batch", response_model=dict)
+def receive_event_batch(events: List[dict] = Depends(read_event_payload), db: Session = Depends(get_db)):
+    """
+    Receive a batch of events (JSON list or binary) and store them in one insert.
+    """
+    try:
+        cache = {}
+        for event in events:
+            event["session_id"] = resolve_session_id(db, event["session_id"], cache)
+        if events:
+            db.bulk_insert_mappings(models.Event, events)
+            db.commit()
+        
+        logger.info(f"Event batch stored: {len(events)} events")
+        
+        return {"status": "stored", "count": len(events)}
+    except Exception as e:
+        # Validation already happened in read_event_payload (422); a storage
+        # or commit failure is retryable, so clients spool the batch
+        logger.error(f"Error storing event batch: {e}")
+        db.rollback()
+        raise HTTPException(status_code=503, detail=f"Error storing event batch: {str(e)}")
 
 @app.get("/alerts", response_model=List[AlertResponse])
 def get_alerts(
     confidence: float = Query(0.65, ge=0.0, le=1.0),
     limit: int = Query(100, ge=1, le=1000),
     session_id: Optional[int] = None,
+    fast: bool = Query(False, description="Serialize selected columns directly, skipping per-row validation"),
+    summaries: bool = Query(False, description="Include <TYPE>_END / <TYPE>_ONGOING summary rows"),
     db: Session = Depends(get_db)
 ):
     """
     Retrieve high-confidence events filtered by confidence threshold.
+    Debouncer summary rows (which carry a duration) repeat a violation that
+    was already reported, so they are left out unless summaries is set.
     """
     try:
         query = db.query(models.Event).filter(models.Event.confidence > confidence)
+        if not summaries:
+            query = query.filter(models.Event.duration.is_(None))
         
         if session_id:
             query = query.filter(models.Event.session_id == session_id)
         
-        events = query.order_by(models.Event.created_at.desc()).limit(limit).all()
+        query = query.order_by(models.Event.created_at.desc()).limit(limit)
+        if fast:
+            return fast_list_response(query, models.Event, AlertResponse)
+        events = query.all()
         return events
     except Exception as e:
         logger.error(f"Error retrieving alerts: {e}")
@@ -174,6 +235,14 @@ def get_session_stats(session_id: int, db: Session = Depends(get_db)):
                 average_confidence=0.0
             )
         
+        # Summary rows (with a duration) describe a violation already counted
+        # by its start event; report them separately
+        summary_events = {}
+        for e in events:
+            if e.duration is not None:
+                summary_events[e.event_type] = summary_events.get(e.event_type, 0) + 1
+        events = [e for e in events if e.duration is None]
+        
         high_conf = len([e for e in events if e.confidence > 0.65])
         event_types = {}
         total_conf = 0
@@ -187,7 +256,8 @@ def get_session_stats(session_id: int, db: Session = Depends(get_db)):
             total_events=len(events),
             high_confidence_events=high_conf,
             event_types=event_types,
-            average_confidence=total_conf / len(events) if events else 0.0
+            average_confidence=total_conf / len(events) if events else 0.0,
+            summary_events=summary_events
         )
     except Exception as e:
         logger.error(f"Error getting session stats: {e}")
@@ -219,8 +289,14 @@ def create_examination(
     return db_exam
 
 @app.get("/examinations", response_model=List[ExaminationSchema])
-def list_examinations(db: Session = Depends(get_db)):
-    return db.query(models.Examination).order_by(models.Examination.created_at.desc()).all()
+def list_examinations(
+    fast: bool = Query(False, description="Serialize selected columns directly, skipping per-row validation"),
+    db: Session = Depends(get_db)
+):
+    query = db.query(models.Examination).order_by(models.Examination.created_at.desc())
+    if fast:
+        return fast_list_response(query, models.Examination, ExaminationSchema)
+    return query.all()
 
 @app.get("/examinations/active", response_model=Optional[ExaminationSchema])
 def get_active_examination(db: Session = Depends(get_db)):
@@ -252,6 +328,7 @@ def get_user_count(role: str = "student", db: Session = Depends(get_db)):
 @app.get("/users", response_model=List[UserSchema])
 def list_users(
     role: Optional[str] = None, 
+    fast: bool = Query(False, description="Serialize selected columns directly, skipping per-row validation"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -263,7 +340,10 @@ def list_users(
     if role:
         query = query.filter(models.User.role == role)
     
-    return query.order_by(models.User.created_at.desc()).all()
+    query = query.order_by(models.User.created_at.desc())
+    if fast:
+        return fast_list_response(query, models.User, UserSchema)
+    return query.all()
 
 import csv
 import io
@@ -10,6 +10,10 @@ class EventBase(BaseModel):
     event_type: str = Field(..., description="Type of detected event")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score 0-1")
     timestamp: Optional[float] = Field(None, description="Unix timestamp of event")
+    duration: Optional[float] = Field(None, ge=0.0, description="Seconds the detection persisted (end/ongoing events)")
+    peak_confidence: Optional[float] = Field(None, ge=0.0, le=1.0, description="Peak confidence over the detection")
+    track_id: Optional[int] = Field(None, description="Tracker id of the detected object, stable across frames")
+    evidence: Optional[str] = Field(None, max_length=64, description="Evidence clip id in the vision module's clip store")
 
 
 class EventCreate(EventBase):
@@ -30,6 +34,10 @@ class AlertResponse(BaseModel):
     event_type: str
     confidence: float
     timestamp: Optional[float]
+    duration: Optional[float] = None
+    peak_confidence: Optional[float] = None
+    track_id: Optional[int] = None
+    evidence: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -51,6 +59,8 @@ class SessionStats(BaseModel):
     high_confidence_events: int
     event_types: dict[str, int]
     average_confidence: float
+    # Debouncer <TYPE>_END / <TYPE>_ONGOING rows, not counted above
+    summary_events: dict[str, int] = {}
 
 # Auth Schemas
 class UserBase(BaseModel):
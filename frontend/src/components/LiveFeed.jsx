@@ -1,9 +1,18 @@
 import React, { useState, useEffect } from 'react';
 import { Video, Mic, Maximize2 } from 'lucide-react';
 
-export default function LiveFeed() {
+// Preview tiers served by /video_feed: thumbnail, standard, full. The main
+// feed stays on full; pass standard or thumbnail where feeds render as tiles.
+export default function LiveFeed({ profile = 'full', sensorId = null }) {
     const [isCameraOn, setIsCameraOn] = useState(true);
     const [isCaptionsOn, setIsCaptionsOn] = useState(true);
+    const [isExpanded, setIsExpanded] = useState(false);
+
+    const feedParams = new URLSearchParams({ profile: isExpanded ? 'full' : profile });
+    if (sensorId !== null) {
+        feedParams.set('sensor_id', sensorId);
+    }
+    const feedUrl = `http://localhost:5001/video_feed?${feedParams}`;
 
     const toggleCamera = async (turnOn) => {
         const endpoint = turnOn ? 'start' : 'stop';
@@ -60,8 +69,8 @@ export default function LiveFeed() {
                     <button className="icon-btn-small">
                         <Mic size={16} />
                     </button>
-                    <button className="icon-btn-small">
-                        <Maximize2 size={16} />
+                    <button className="icon-btn-small" title="Full Quality" onClick={() => setIsExpanded(!isExpanded)}>
+                        <Maximize2 size={16} color={isExpanded ? "#2563EB" : undefined} />
                     </button>
                 </div>
             </div>
@@ -69,7 +78,7 @@ export default function LiveFeed() {
             <div className="video-wrapper">
                 {isCameraOn ? (
                     <img
-                        src="http://localhost:5001/video_feed"
+                        src={feedUrl}
                         alt="Live Stream"
                         className="video-player"
                         onError={(e) => {
@@ -4,6 +4,8 @@ Scalable AI System - Combined Startup Script
 Starts all modules: Backend, Vision, and Audio
 """
 
+import argparse
+import importlib.util
 import subprocess
 import sys
 import time
@@ -11,6 +13,9 @@ import logging
 from pathlib import Path
 import signal
 import os
+import random
+import threading
+import urllib.request
 
 # Setup logging
 logging.basicConfig(
@@ -32,14 +37,23 @@ PYTHON = sys.executable
 # Store processes for cleanup
 processes = []
 
+# Set on shutdown so the supervisor stops restarting services
+shutdown_event = threading.Event()
 
-def run_process(cmd, name, cwd=None):
+# Distribution names whose import name differs
+MODULE_NAMES = {
+    "opencv-python": "cv2",
+}
+
+
+def run_process(cmd, name, cwd=None, env=None):
     """Run a process and track it"""
     logger.info(f"Starting {name}...")
     try:
         process = subprocess.Popen(
             cmd,
             cwd=cwd or PROJECT_ROOT,
+            env={**os.environ, **env} if env else None,
             stdout=None,  # Inherit stdout
             stderr=None,  # Inherit stderr
             text=True,
@@ -54,37 +68,71 @@ def run_process(cmd, name, cwd=None):
 
 
 def check_dependencies():
-    """Verify all required packages are installed"""
+    """Verify all required packages are installed without importing them"""
     logger.info("Checking dependencies...")
     
     required_packages = [
         "fastapi", "uvicorn", "sqlalchemy", "pydantic", "requests",
         "opencv-python", "ultralytics", "numpy", "mediapipe",
-        "sounddevice", "librosa", "react"
+        "sounddevice", "librosa"
     ]
     
     missing = []
     for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
-        except ImportError:
+        module = MODULE_NAMES.get(package, package.replace("-", "_"))
+        if importlib.util.find_spec(module) is None:
             missing.append(package)
     
+    # react is an npm package, check the frontend install instead
+    if not (FRONTEND_DIR / "node_modules" / "react").is_dir():
+        missing.append("react")
+    
     if missing:
         logger.warning(f"Missing packages: {', '.join(missing)}")
-        logger.info("Run: pip install -r requirements.txt")
+        logger.info("Run: pip install -r requirements.txt (and npm install in frontend/)")
     else:
         logger.info("All dependencies available")
 
 
-def start_backend():
+def init_schema():
+    """Create database tables once, before any backend worker starts"""
+    logger.info("Creating database schema...")
+    cmd = [PYTHON, "-c", "from backend.database.database import init_db; init_db()"]
+    subprocess.run(cmd, cwd=PROJECT_ROOT, check=True)
+    logger.info("Database schema ready")
+
+
+def backend_command(profile="dev", workers=None):
+    """Build the backend launch command for a profile"""
+    if profile == "dev":
+        return [PYTHON, "-m", "uvicorn", "backend.main:app", "--host", "0.0.0.0", "--port", "8000", "--reload"]
+
+    workers = str(workers or os.cpu_count() or 1)
+    if os.name != "nt" and importlib.util.find_spec("gunicorn") is not None:
+        # Import the app once in the master and fork workers from it. The engine
+        # connects lazily, so no pooled connections are shared across the fork.
+        return [
+            PYTHON, "-m", "gunicorn", "backend.main:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "--workers", workers, "--bind", "0.0.0.0:8000", "--preload"
+        ]
+    if os.name != "nt":
+        logger.warning("gunicorn is not installed; production backend falls back to uvicorn --workers")
+    return [PYTHON, "-m", "uvicorn", "backend.main:app", "--host", "0.0.0.0", "--port", "8000", "--workers", workers]
+
+
+def start_backend(profile="dev", workers=None):
     """Start FastAPI backend server"""
     logger.info("=" * 60)
-    logger.info("Starting Backend Server (FastAPI)")
+    logger.info(f"Starting Backend Server (FastAPI, {profile} profile)")
     logger.info("=" * 60)
     
-    cmd = [PYTHON, "-m", "uvicorn", "backend.main:app", "--host", "0.0.0.0", "--port", "8000", "--reload"]
-    process = run_process(cmd, "Backend", PROJECT_ROOT)
+    env = None
+    if profile == "production":
+        init_schema()
+        env = {"SAI_SCHEMA_READY": "1"}
+    cmd = backend_command(profile, workers)
+    process = run_process(cmd, "Backend", PROJECT_ROOT, env=env)
     return process
 
 
@@ -123,8 +171,185 @@ def start_frontend():
     return process
 
 
+def probe(url, timeout=1.0):
+    """Return True if url answers with a 2xx status"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return 200 <= resp.status < 300
+    except Exception:
+        return False
+
+
+class Service:
+    """
+    A supervised child process.
+
+    Args:
+        name: Display name
+        start: Callable returning a started subprocess.Popen (or None)
+        ready_url: HTTP endpoint that answers 2xx once the service is usable;
+            services without one are ready as soon as they are running
+        depends_on: Services that must be ready before this one starts
+    """
+    
+    def __init__(self, name, start, ready_url=None, depends_on=()):
+        self.name = name
+        self.start = start
+        self.ready_url = ready_url
+        self.depends_on = list(depends_on)
+        self.process = None
+        self.ready = threading.Event()
+        self.launching = False
+        self.restarts = 0
+        self.started_at = 0.0
+
+
+class Supervisor:
+    """
+    Starts services in parallel, gates dependents on readiness probes and
+    restarts crashed children with exponential backoff and jitter.
+    
+    The watcher runs from the start, so a dependency that crashes or never
+    gets ready during startup is restarted like any other. A dependent gives
+    up after ready_timeout with an error and is started by the watcher once
+    its dependencies are ready again.
+    """
+    
+    def __init__(self, services, ready_timeout=120.0, backoff_base=1.0, backoff_max=30.0, stable_after=60.0,
+                 watch_interval=1.0):
+        self.services = services
+        self.ready_timeout = ready_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.watch_interval = watch_interval
+        self.watcher = None
+    
+    def spawn_launch(self, service):
+        """Run launch() in a thread; the service counts as launching until it returns"""
+        service.launching = True
+        thread = threading.Thread(target=self.launch, args=(service,), name=f"launch-{service.name}", daemon=True)
+        thread.start()
+        return thread
+    
+    def launch(self, service):
+        """Wait for dependencies, start the process, then wait for readiness"""
+        try:
+            self._launch(service)
+        except Exception:
+            logger.exception(f"Failed to start {service.name}")
+            service.process = None
+        finally:
+            service.launching = False
+    
+    def _launch(self, service):
+        deadline = time.time() + self.ready_timeout
+        for dep in service.depends_on:
+            while not dep.ready.wait(timeout=0.5):
+                if shutdown_event.is_set():
+                    return
+                if time.time() >= deadline:
+                    logger.error(
+                        f"{service.name} not started: {dep.name} not ready after {self.ready_timeout:.0f}s "
+                        f"(will start once it is)"
+                    )
+                    service.process = None
+                    return
+        if shutdown_event.is_set():
+            return
+        
+        service.ready.clear()
+        if service.process in processes:
+            processes.remove(service.process)
+        service.process = None
+        service.process = service.start()
+        service.started_at = time.time()
+        if service.process is None:
+            return
+        
+        deadline = time.time() + self.ready_timeout
+        while not shutdown_event.is_set() and time.time() < deadline:
+            if service.process.poll() is not None:
+                return
+            if self.check_ready(service):
+                return
+            time.sleep(0.25)
+        if not service.ready.is_set():
+            logger.warning(f"{service.name} not ready after {self.ready_timeout:.0f}s")
+    
+    def check_ready(self, service):
+        """Probe a running service and mark it ready"""
+        if service.ready_url is None or probe(service.ready_url):
+            service.ready.set()
+            logger.info(f"{service.name} ready ({time.time() - service.started_at:.1f}s)")
+            return True
+        return False
+    
+    def start_all(self):
+        """
+        Launch every service concurrently, with the watcher already running,
+        and block until each is ready or has failed or given up.
+        """
+        threads = [self.spawn_launch(svc) for svc in self.services]
+        self.watcher = threading.Thread(target=self.watch, args=(self.watch_interval,), name="supervisor-watch",
+                                        daemon=True)
+        self.watcher.start()
+        for t in threads:
+            t.join()
+    
+    def wait(self):
+        """Block until shutdown while the watcher keeps services running"""
+        while self.watcher.is_alive():
+            self.watcher.join(timeout=1.0)
+    
+    def backoff(self, service):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** service.restarts))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def watch(self, interval=1.0):
+        """
+        Until shutdown: restart services whose process has exited or failed
+        to start, start dependents once their dependencies are ready, and
+        pick up late readiness of running services.
+        """
+        pending = {}
+        while not shutdown_event.wait(interval):
+            now = time.time()
+            for svc in self.services:
+                if svc.launching:
+                    continue
+                proc = svc.process
+                if svc.name in pending:
+                    if now >= pending[svc.name]:
+                        del pending[svc.name]
+                        svc.restarts += 1
+                        logger.info(f"Restarting {svc.name} (attempt {svc.restarts})")
+                        self.spawn_launch(svc)
+                    continue
+                if proc is not None and proc.poll() is None:
+                    if not svc.ready.is_set():
+                        self.check_ready(svc)
+                    elif svc.restarts and now - svc.started_at > self.stable_after:
+                        svc.restarts = 0
+                    continue
+                if proc is None and not all(dep.ready.is_set() for dep in svc.depends_on):
+                    # Gave up on a dependency; start once it is ready
+                    continue
+                svc.ready.clear()
+                delay = self.backoff(svc)
+                if proc is None:
+                    logger.warning(f"{svc.name} is not running, starting in {delay:.1f}s")
+                else:
+                    logger.warning(
+                        f"{svc.name} (PID {proc.pid}) exited with code {proc.returncode}, "
+                        f"restarting in {delay:.1f}s"
+                    )
+                pending[svc.name] = now + delay
+
+
 def cleanup(signum=None, frame=None):
     """Cleanup and terminate all processes"""
+    shutdown_event.set()
     logger.info("\n" + "=" * 60)
     logger.info("Shutting down all services...")
     logger.info("=" * 60)
@@ -144,8 +369,24 @@ def cleanup(signum=None, frame=None):
     sys.exit(0)
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Start all Scalable AI services")
+    parser.add_argument(
+        "--profile", choices=["dev", "production"], default="dev",
+        help="dev: single reloading backend; production: multi-worker backend without reload "
+             "(gunicorn with preloaded workers where installed on POSIX, else uvicorn --workers)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Backend worker processes in production (default: CPU count)"
+    )
+    return parser.parse_args(argv)
+
+
 def main():
     """Main startup function"""
+    args = parse_args()
+    
     logger.info("=" * 60)
     logger.info("Scalable AI Exam Monitoring System")
     logger.info("Starting all modules...")
@@ -157,20 +398,22 @@ def main():
     
     # Check dependencies
     check_dependencies()
-    time.sleep(1)
-    
-    # Start services in order
-    backend = start_backend()
-    time.sleep(3)  # Wait for backend to start
-    
-    vision = start_vision()
-    time.sleep(2)
     
-    audio = start_audio()
-    time.sleep(2)
+    # Start services in parallel; vision and audio fetch the active exam
+    # from the backend at startup, so they wait for it to be ready
+    startup = time.time()
+    backend = Service("Backend", lambda: start_backend(args.profile, args.workers),
+                      ready_url="http://localhost:8000/health")
+    vision = Service("Vision", start_vision, ready_url="http://localhost:5001/ready", depends_on=[backend])
+    audio = Service("Audio", start_audio, depends_on=[backend])
+    frontend = Service("Frontend", start_frontend, ready_url="http://localhost:3000")
+    supervisor = Supervisor([backend, vision, audio, frontend])
+    supervisor.start_all()
     
-    frontend = start_frontend()
-    time.sleep(2)
+    not_ready = [svc.name for svc in supervisor.services if not svc.ready.is_set()]
+    if not_ready:
+        logger.warning(f"Not ready: {', '.join(not_ready)} (will keep supervising)")
+    logger.info(f"Startup took {time.time() - startup:.1f}s")
     
     logger.info("=" * 60)
     logger.info("SYSTEM READY")
@@ -182,15 +425,9 @@ def main():
     logger.info("Press Ctrl+C to stop all services")
     logger.info("=" * 60)
     
-    # Keep the main process alive
+    # Keep the main process alive, restarting crashed services
     try:
-        while True:
-            time.sleep(1)
-            
-            # Check if any process has died
-            for process in processes:
-                if process and process.poll() is not None:
-                    logger.warning(f"Process {process.pid} has terminated")
+        supervisor.wait()
     except KeyboardInterrupt:
         cleanup()
 
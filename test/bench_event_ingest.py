@@ -0,0 +1,81 @@
+"""
+Benchmark event ingest encodings: one JSON object per POST (current AI
+module behaviour), a JSON list batch, and the binary batch format from
+backend/event_codec.py. Reports bytes per event and server-side decode +
+validation CPU per event.
+
+Run from the project root:
+    python test/bench_event_ingest.py --events 1000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+
+from backend.event_codec import decode_events, encode_events
+from backend.schemas import EventCreate
+
+
+def make_events(n):
+    types = ["OBJECT_DETECTED", "GAZE_DEVIATION", "AUDIO_ANOMALY"]
+    return [
+        {
+            "source": "audio" if i % 5 == 0 else "video",
+            "session_id": 7,
+            "sensor_id": 1 + i % 4,
+            "event_type": random.choice(types),
+            "confidence": round(random.uniform(0.3, 1.0), 4),
+            "timestamp": 1_700_000_000.0 + i * 0.03,
+        }
+        for i in range(n)
+    ]
+
+
+def per_event_cpu(fn, n, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        best = min(best, time.process_time() - start)
+    return best / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    singles = [json.dumps(e).encode("utf-8") for e in events]
+    json_batch = json.dumps(events).encode("utf-8")
+    binary_batch = encode_events(events)
+    adapter = TypeAdapter(List[EventCreate])
+
+    decoded = decode_events(binary_batch)
+    assert [d["event_type"] for d in decoded] == [e["event_type"] for e in events]
+
+    results = [
+        ("json single", sum(map(len, singles)),
+         lambda: [EventCreate(**json.loads(b)) for b in singles]),
+        ("json batch", len(json_batch),
+         lambda: adapter.validate_json(json_batch)),
+        ("binary batch", len(binary_batch),
+         lambda: decode_events(binary_batch)),
+    ]
+
+    print(f"events={args.events}")
+    for name, size, fn in results:
+        cpu = per_event_cpu(fn, args.events, args.repeat)
+        print(f"{name:>13}: {size / args.events:7.1f} bytes/event  {cpu:7.2f} us/event")
+
+
+if __name__ == "__main__":
+    main()
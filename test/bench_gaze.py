@@ -0,0 +1,78 @@
+"""
+Per-frame latency of GazeDetector before and after the VIDEO running mode,
+landmark subsetting and face-ROI crop changes, on recorded frames.
+
+"before" replays the previous implementation: IMAGE mode on the full frame
+and all ~478 landmarks converted to pixels in a list comprehension.
+
+Run from the project root:
+    python test/bench_gaze.py --frames recordings/candidate.mp4
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai-modules" / "vision"))
+
+from bench_object_backends import load_frames
+from gaze import GazeDetector
+
+
+def legacy_detect(detector, frame):
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+    result = detector.face_landmarker.detect(mp_image)
+    if not result.face_landmarks:
+        return None
+    landmarks = result.face_landmarks[0]
+    mesh_points = np.array([[int(p.x * frame.shape[1]), int(p.y * frame.shape[0])] for p in landmarks])
+    return mesh_points[1], mesh_points[234], mesh_points[454]
+
+
+def measure(fn, frames, warmup):
+    for frame in frames[:warmup]:
+        fn(frame)
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        fn(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", required=True, help="Video file or directory of images")
+    parser.add_argument("--limit", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.limit)
+    if not frames:
+        sys.exit(f"No frames loaded from {args.frames}")
+
+    image_mode = GazeDetector(running_mode="image", roi_margin=None)
+    if image_mode.face_landmarker is None:
+        sys.exit("face_landmarker.task is not available")
+    variants = [
+        ("before: image, all landmarks", lambda f: legacy_detect(image_mode, f)),
+        ("image, subset", GazeDetector(running_mode="image", roi_margin=None).detect),
+        ("image, subset + ROI crop", GazeDetector(running_mode="image", roi_margin=0.3).detect),
+        ("video, subset", GazeDetector(running_mode="video").detect),
+    ]
+
+    print(f"frames={len(frames)}  latency ms (mean / p50 / p95)")
+    for name, fn in variants:
+        mean, p50, p95 = measure(fn, frames, args.warmup)
+        print(f"{name:>30}: {mean:6.2f} / {p50:6.2f} / {p95:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
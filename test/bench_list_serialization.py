@@ -0,0 +1,91 @@
+"""
+Benchmark list endpoint serialization: the default response_model path
+(Pydantic from_attributes + jsonable_encoder + stdlib json) against the
+fast path (column tuples + backend.fast_json.dumps).
+
+Run from the project root:
+    python test/bench_list_serialization.py --rows 1000
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from backend.schemas import AlertResponse, Event
+from backend import fast_json
+
+
+def make_rows(n):
+    now = datetime.datetime.utcnow()
+    return [
+        SimpleNamespace(
+            event_id=i,
+            source="video" if i % 3 else "audio",
+            session_id=1,
+            sensor_id=1 + i % 4,
+            event_type="OBJECT_DETECTED" if i % 2 else "GAZE_DEVIATION",
+            confidence=0.5 + (i % 50) / 100,
+            timestamp=1_700_000_000.0 + i,
+            # Every tenth row is a debouncer summary
+            duration=None if i % 10 else 4.0,
+            peak_confidence=None if i % 10 else 0.99,
+            track_id=i % 7 if i % 2 else None,
+            evidence=f"1-{1_700_000_000_000 + i}-abcd1234" if i % 2 else None,
+            created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def default_path(adapter, objs):
+    validated = adapter.validate_python(objs, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(schema, names, tuples):
+    return fast_json.dumps(fast_json.rows_to_dicts(schema, names, tuples))
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    objs = make_rows(args.rows)
+    encoder = "orjson" if fast_json.orjson is not None else "json (stdlib)"
+    print(f"rows={args.rows} repeat={args.repeat} fast encoder={encoder}")
+
+    for schema in (AlertResponse, Event):
+        adapter = TypeAdapter(List[schema])
+        names = list(schema.model_fields)
+        tuples = [tuple(getattr(o, n) for n in names) for o in objs]
+
+        slow = timeit(lambda: default_path(adapter, objs), args.repeat)
+        fast = timeit(lambda: fast_path(schema, names, tuples), args.repeat)
+        assert json.loads(default_path(adapter, objs)) == json.loads(fast_path(schema, names, tuples))
+
+        print(f"{schema.__name__:>14}: default {slow * 1000:8.2f} ms  fast {fast * 1000:8.2f} ms  "
+              f"speedup {slow / fast:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
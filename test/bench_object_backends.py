@@ -0,0 +1,107 @@
+"""
+Benchmark ObjectDetector inference backends on recorded frames and check
+detection parity against the PyTorch path.
+
+Run from the project root:
+    python test/bench_object_backends.py --frames recordings/hall.mp4 \
+        --backends torch onnx openvino openvino-int8 --imgsz 640 416
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai-modules" / "vision"))
+
+from objects import ObjectDetector
+
+
+def load_frames(path, limit):
+    path = Path(path)
+    frames = []
+    if path.is_dir():
+        for f in sorted(path.iterdir()):
+            if f.suffix.lower() in (".jpg", ".jpeg", ".png", ".bmp"):
+                frames.append(cv2.imread(str(f)))
+            if len(frames) >= limit:
+                break
+    else:
+        cap = cv2.VideoCapture(str(path))
+        while len(frames) < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+        cap.release()
+    return frames
+
+
+def iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def parity(reference, candidate, threshold=0.5):
+    """Fraction of reference detections matched (same label, IoU >= threshold) and their mean IoU"""
+    matched, total, ious = 0, 0, []
+    for ref_events, cand_events in zip(reference, candidate):
+        unused = list(cand_events)
+        for r in ref_events:
+            total += 1
+            best = max(
+                (c for c in unused if c["object"] == r["object"]),
+                key=lambda c: iou(r["box"], c["box"]),
+                default=None,
+            )
+            if best is not None and iou(r["box"], best["box"]) >= threshold:
+                matched += 1
+                ious.append(iou(r["box"], best["box"]))
+                unused.remove(best)
+    recall = matched / total if total else 1.0
+    return recall, (sum(ious) / len(ious) if ious else 0.0), total
+
+
+def run(detector, frames, warmup):
+    for frame in frames[:warmup]:
+        detector.detect(frame)
+    results = []
+    start = time.perf_counter()
+    for frame in frames:
+        results.append(detector.detect(frame))
+    return results, len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", required=True, help="Video file or directory of images")
+    parser.add_argument("--limit", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "openvino", "openvino-int8"])
+    parser.add_argument("--imgsz", nargs="+", type=int, default=[640])
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.limit)
+    if not frames:
+        sys.exit(f"No frames loaded from {args.frames}")
+    print(f"frames={len(frames)}")
+
+    reference, ref_fps = run(ObjectDetector(backend="torch", imgsz=640), frames, args.warmup)
+    print(f"{'torch@640 (reference)':>24}: {ref_fps:7.1f} fps")
+
+    for backend in args.backends:
+        for imgsz in args.imgsz:
+            if backend == "torch" and imgsz == 640:
+                continue
+            results, fps = run(ObjectDetector(backend=backend, imgsz=imgsz), frames, args.warmup)
+            recall, mean_iou, total = parity(reference, results)
+            print(f"{backend + '@' + str(imgsz):>24}: {fps:7.1f} fps  x{fps / ref_fps:4.2f}  "
+                  f"parity {recall:6.1%} of {total} detections  mean IoU {mean_iou:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+End-to-end benchmark of the vision pipeline on a recording, with no camera
+or backend needed: run_vision_loop replays a video file or frame directory
+and posts events to a local stub backend.
+
+Reports the per-stage latency percentiles recorded by the pipeline's own
+metrics registry (the same numbers /metrics serves), end-to-end fps, events
+per minute and peak RSS. Models must be in the vision model cache (or pass
+--allow-download).
+
+Run from the project root:
+    python test/bench_vision_pipeline.py --frames recordings/candidate.mp4
+    python test/bench_vision_pipeline.py --frames recordings/frames/ --speed native --track
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai-modules" / "vision"))
+
+import main as vision
+import server
+from metrics import metrics
+from objects import BACKENDS
+
+# Stages shown first, in pipeline order; any other recorded stage follows
+STAGES = ("camera_read", "objects", "objects_batch", "gaze", "pose", "annotate", "event_post")
+
+received = {"events": 0, "posts": 0}
+started = {}
+
+
+class StubBackend(BaseHTTPRequestHandler):
+    """Accepts the vision module's backend calls and counts events"""
+
+    def do_GET(self):
+        body = b'{"id": 1}' if self.path.startswith("/examinations/active") else b"null"
+        self._reply(200, body)
+
+    def do_POST(self):
+        payload = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/events/batch"):
+            received["events"] += len(json.loads(payload))
+            received["posts"] += 1
+        self._reply(201, b"[]")
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def mark_start():
+    # Model loading and warm-up are excluded: the clock starts once the
+    # pipeline reports ready, right before the source is opened
+    while not server.ready:
+        time.sleep(0.01)
+    started["t"] = time.perf_counter()
+
+
+def peak_rss_mb():
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own / 2**20, children / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", required=True, help="Video file or directory of frames")
+    parser.add_argument("--speed", choices=("native", "fast"), default="fast")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--object-backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--track", action="store_true")
+    parser.add_argument("--allow-download", action="store_true")
+    args = parser.parse_args()
+    frames = os.path.abspath(args.frames)
+
+    backend = ThreadingHTTPServer(("127.0.0.1", 0), StubBackend)
+    threading.Thread(target=backend.serve_forever, daemon=True).start()
+    vision.BACKEND_URL = f"http://127.0.0.1:{backend.server_port}"
+    vision.REPLAY_OPTIONS.update(speed=args.speed, loop=False)
+    # Keep every sample of the run instead of the rolling /metrics window
+    metrics.window = 10 ** 7
+    threading.Thread(target=mark_start, daemon=True).start()
+
+    stop = threading.Event()
+    # Daemon and cancelled on the way out, so a failing run exits right away
+    timer = threading.Timer(args.duration, stop.set) if args.duration else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    # The event client spools into the working directory
+    os.chdir(tempfile.mkdtemp(prefix="sai_bench_"))
+
+    try:
+        vision.run_vision_loop(
+            stop=stop, sources=[frames], object_backend=args.object_backend, imgsz=args.imgsz,
+            track=args.track, offline=not args.allow_download,
+        )
+        elapsed = time.perf_counter() - started.get("t", time.perf_counter())
+    finally:
+        if timer is not None:
+            timer.cancel()
+        backend.shutdown()
+
+    snapshot = metrics.snapshot()
+    stages = snapshot["stages"]
+    processed = snapshot["counters"].get("frames_processed", 0)
+    print(f"frames={processed}  elapsed={elapsed:.1f}s  speed={args.speed}  backend={args.object_backend}")
+    print(f"{'stage':>20}  {'calls':>6}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'max ms':>8}")
+    for stage in [*STAGES, *sorted(set(stages) - set(STAGES))]:
+        hist = stages.get(stage)
+        if not hist or "p50_ms" not in hist:
+            continue
+        print(f"{stage:>20}  {hist['count']:>6}  {hist['p50_ms']:8.2f}  {hist['p95_ms']:8.2f}  "
+              f"{hist['p99_ms']:8.2f}  {hist['max_ms']:8.2f}")
+    print(f"end-to-end fps: {processed / elapsed:.1f}" if elapsed > 0 else "end-to-end fps: n/a")
+    print(f"events/min: {received['events'] / elapsed * 60:.1f} ({received['events']} events in "
+          f"{received['posts']} posts)" if elapsed > 0 else "events/min: n/a")
+    own, children = peak_rss_mb()
+    print(f"peak RSS: {own:.0f} MiB (children {children:.0f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from pathlib import Path
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai-modules"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "ai-modules" / "vision"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "ai-modules" / "audio"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
@@ -151,6 +152,39 @@ class TestBackendIntegration:
         assert not is_valid
         assert "sensor_id" in msg
 
+    def test_fast_json_matches_schema_output(self):
+        """Test fast list serialization matches the response_model output"""
+        import json
+        from datetime import datetime
+        from backend.fast_json import dumps, rows_to_dicts
+        from backend.schemas import User
+
+        names = list(User.model_fields)
+        row = {"username": "u", "email": "u@x", "role": "student", "id": 3,
+               "is_active": 1, "created_at": datetime(2026, 1, 2, 3, 4, 5)}
+        fast = json.loads(dumps(rows_to_dicts(User, names, [tuple(row[n] for n in names)])))
+        assert fast == [json.loads(User(**row).model_dump_json())]
+
+    def test_binary_event_codec_roundtrip(self):
+        """Test binary event batches decode back to the posted events"""
+        from backend.event_codec import encode_events, decode_events, EventDecodeError
+
+        events = [
+            {"source": "video", "session_id": 4, "sensor_id": 1,
+             "event_type": "OBJECT_DETECTED_END", "confidence": 0.85, "timestamp": 1000.5,
+             "duration": 12.5, "peak_confidence": 0.9, "track_id": 7, "evidence": "1-1000500-abcd1234"},
+            {"source": "audio", "session_id": 4, "sensor_id": 2,
+             "event_type": "AUDIO_ANOMALY", "confidence": 0.6, "timestamp": None,
+             "duration": None, "peak_confidence": None, "track_id": None, "evidence": None},
+        ]
+        assert decode_events(encode_events(events)) == events
+
+        bad = dict(events[0], confidence=1.5)
+        with pytest.raises(EventDecodeError):
+            decode_events(encode_events([bad]))
+        with pytest.raises(EventDecodeError):
+            decode_events(encode_events([dict(events[0], evidence="x" * 65)]))
+
 
 class TestVisionModuleIntegration:
     """Test vision module components"""
@@ -201,6 +235,339 @@ class TestVisionModuleIntegration:
         except Exception as e:
             pytest.fail(f"ObjectDetector initialization failed: {e}")
 
+    def test_latest_queue_keeps_newest(self):
+        """Test pipeline handoff drops stale frames instead of queueing them"""
+        from pipeline import LatestQueue
+
+        q = LatestQueue()
+        for i in range(3):
+            q.put(i)
+        assert q.get(timeout=0.1) == 2
+        assert q.dropped == 2
+        assert q.get(timeout=0.01) is None
+
+    def test_broadcaster_encodes_each_frame_once(self):
+        """Test MJPEG clients share one JPEG encode per published frame"""
+        import numpy as np
+        from broadcast import FrameBroadcaster
+
+        b = FrameBroadcaster()
+        clients = [b.stream() for _ in range(3)]
+        thumbs = [b.stream("thumbnail") for _ in range(2)]
+        b.publish(np.zeros((480, 640, 3), dtype=np.uint8))
+        parts = [next(c) for c in clients]
+        thumb_parts = [next(c) for c in thumbs]
+        assert parts[0] == parts[1] == parts[2]
+        assert thumb_parts[0] == thumb_parts[1]
+        assert len(thumb_parts[0]) < len(parts[0])
+        assert b.encodes == {"thumbnail": 1, "standard": 0, "full": 1}
+        assert b.wait(1, timeout=0.01) == (1, None)
+
+    def test_frame_ring_shares_frames_without_copy(self):
+        """Test readers attached by name see the writer's newest slot in place"""
+        import numpy as np
+        from frame_ring import FrameRing
+
+        writer = FrameRing((4, 4, 3), slots=3, create=True)
+        reader = FrameRing((4, 4, 3), slots=3, name=writer.name)
+        try:
+            assert reader.latest() == (0, None)
+            writer.acquire()[:] = 7
+            seq = writer.commit()
+            got, view = reader.latest()
+            assert got == seq and view.max() == 7
+            for value in range(3):
+                writer.write(np.full((4, 4, 3), value, dtype=np.uint8))
+            assert not reader.valid(seq)
+            assert reader.latest(after_seq=reader.seq)[1] is None
+        finally:
+            reader.close()
+            writer.close()
+
+    def test_worker_pool_applies_late_results(self):
+        """Test a detector slower than the join timeout still delivers results and gets new frames"""
+        import queue
+        import threading
+        import time
+        from types import SimpleNamespace
+        from workers import WorkerPool
+
+        ring = SimpleNamespace(shape=(4, 4, 3), slots=4, name="unused")
+        pool = WorkerPool(ring, {"objects": None})
+        pool.results = queue.Queue()
+        worker = pool.workers["objects"]
+        worker.requests = queue.Queue()
+        worker.process = SimpleNamespace(is_alive=lambda: True, pid=0, exitcode=None)
+
+        def slow_detector():
+            # Stand-in for worker_main with a 0.3 s detector
+            while (seq := worker.requests.get()) is not None:
+                time.sleep(0.3)
+                pool.results.put(("objects", seq, [f"detections {seq}"], 0.3, None))
+
+        thread = threading.Thread(target=slow_detector, daemon=True)
+        thread.start()
+        try:
+            assert worker.idle()
+            assert pool.submit(1, ["objects"]) == ["objects"]
+            assert pool.collect(1, ["objects"], timeout=0.05) == {}
+            # Still busy: nothing sent, but the late result is picked up once it lands
+            assert not worker.idle()
+            assert pool.submit(2, ["objects"]) == []
+            time.sleep(0.4)
+            assert pool.collect(2, [], timeout=0.05) == {"objects": (["detections 1"], 0.3)}
+            assert worker.idle() and worker.completed == 1
+            assert pool.submit(3, ["objects"]) == ["objects"]
+            assert pool.collect(3, ["objects"], timeout=1.0) == {"objects": (["detections 3"], 0.3)}
+        finally:
+            worker.requests.put(None)
+            thread.join()
+
+    def test_replay_source_plays_frame_directory(self, tmp_path):
+        """Test a frame directory replays in order through the Camera interface"""
+        import cv2
+        import numpy as np
+        from replay import ReplaySource, is_replay_source
+
+        for i in range(3):
+            cv2.imwrite(str(tmp_path / f"{i:04d}.png"), np.full((8, 8, 3), i, dtype=np.uint8))
+        assert is_replay_source(str(tmp_path)) and not is_replay_source(0)
+        source = ReplaySource(tmp_path, speed="fast")
+        assert [int(source.read()[0, 0, 0]) for _ in range(3)] == [0, 1, 2]
+        assert source.read() is None and source.finished
+
+    def test_metrics_histograms_and_counters(self):
+        """Test stage timers report percentiles alongside counters and gauges"""
+        from metrics import Metrics
+
+        m = Metrics(window=100)
+        for ms in range(1, 101):
+            m.observe("objects", ms / 1000)
+        with m.timer("gaze"):
+            pass
+        m.incr("frames_processed", 3)
+        m.gauge("stream_clients", lambda: 2)
+        snap = m.snapshot()
+        assert snap["stages"]["objects"]["p50_ms"] == pytest.approx(51.0)
+        assert snap["stages"]["objects"]["max_ms"] == pytest.approx(100.0)
+        assert snap["stages"]["gaze"]["count"] == 1
+        assert snap["counters"] == {"frames_processed": 3}
+        assert snap["gauges"] == {"stream_clients": 2}
+
+    def test_motion_gate_skips_static_frames(self):
+        """Test detectors skip still frames until results go stale, and run on motion"""
+        import numpy as np
+        from motion import MotionGate
+
+        gate = MotionGate(max_staleness=2.0)
+        still = np.full((480, 640, 3), 100, dtype=np.uint8)
+        assert gate.should_run("objects", gate.update(still), now=0.0)
+        assert not gate.should_run("objects", gate.update(still), now=0.5)
+        assert gate.should_run("objects", gate.update(still), now=2.5)
+
+        moved = still.copy()
+        moved[0:120, 0:160] = 255
+        assert gate.update(moved)
+        assert gate.snapshot()["skipped"] == {"objects": 1}
+
+    def test_frame_context_caches_views(self):
+        """Test derived views are computed once per frame and shared"""
+        import numpy as np
+        from frame_context import FrameContext, as_context
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        frame[..., 0] = 255  # pure blue in BGR
+        ctx = FrameContext(frame)
+        assert ctx.rgb is ctx.rgb and ctx.rgb[0, 0].tolist() == [0, 0, 255]
+        assert ctx.resized(64).shape == (48, 64, 3)
+        image, scale, pad = ctx.letterbox(320)
+        assert image.shape == (320, 320, 3) and scale == 0.5 and pad == (0, 40)
+        assert ctx.face_crop() is None
+        ctx.face_box = (100, 100, 200, 200)
+        assert ctx.face_crop(margin=0.1).shape == (120, 120, 3)
+        assert as_context(ctx) is ctx
+
+    def test_landmarker_video_clock_strictly_increases(self):
+        """Test VIDEO mode timestamps never repeat, even within one millisecond"""
+        from landmarker import VideoClock, warmup
+
+        clock = VideoClock()
+        stamps = [clock.next_ms() for _ in range(50)]
+        assert all(b > a for a, b in zip(stamps, stamps[1:]))
+
+        shapes = []
+        warmup(lambda frame: shapes.append(frame.shape), shape=(4, 6, 3), runs=2)
+        assert shapes == [(4, 6, 3), (4, 6, 3)]
+
+    def test_pose_behaviors(self):
+        """Test turning around and reaching are classified from shoulder/wrist landmarks"""
+        from pose_behaviors import classify_pose, NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST
+
+        seated = {
+            NOSE: (320, 150, 0, 1.0),
+            LEFT_SHOULDER: (370, 250, 0, 1.0), RIGHT_SHOULDER: (270, 250, 0, 1.0),
+            LEFT_WRIST: (360, 380, 0, 1.0), RIGHT_WRIST: (280, 380, 0, 1.0),
+        }
+        assert classify_pose(seated) == []
+
+        turned = {**seated, LEFT_SHOULDER: (340, 250, -80, 1.0), RIGHT_SHOULDER: (300, 250, 80, 1.0)}
+        assert [e["type"] for e in classify_pose(turned)] == ["TURNING_AROUND"]
+
+        reaching = {**seated, RIGHT_WRIST: (120, 260, 0, 1.0)}
+        events = classify_pose(reaching)
+        assert [(e["type"], e["direction"]) for e in events] == [("REACHING", "RIGHT")]
+
+    def test_enrollment_store_matches_and_persists(self, tmp_path):
+        """Test enrolled embeddings are matched by cosine similarity and survive a reload"""
+        import numpy as np
+        from identity import EnrollmentStore, EMBEDDING_SIZE
+
+        rng = np.random.default_rng(0)
+        faces = rng.normal(size=(3, EMBEDDING_SIZE)).astype(np.float32)
+        faces /= np.linalg.norm(faces, axis=1, keepdims=True)
+        store = EnrollmentStore(tmp_path / "enrollment.npz")
+        assert store.match(faces[0]) == (None, 0.0)
+        store.add(["s1", "s2", "s3"], faces)
+        store.save()
+
+        reloaded = EnrollmentStore(tmp_path / "enrollment.npz")
+        assert len(reloaded) == 3 and reloaded.embeddings.flags["C_CONTIGUOUS"]
+        student_id, score = reloaded.match(faces[1])
+        assert student_id == "s2" and score == pytest.approx(1.0, abs=1e-5)
+
+    def test_embedder_process_restarts_after_backoff(self):
+        """Test a dead face embedder is relaunched once its backoff delay passes"""
+        from types import SimpleNamespace
+        from identity import EmbedderProcess
+
+        embedder = EmbedderProcess.__new__(EmbedderProcess)
+        embedder.backoff_base, embedder.backoff_max = 1.0, 30.0
+        embedder.restarts, embedder.restart_at, embedder.last_error = 0, 0.0, None
+        embedder.process = SimpleNamespace(is_alive=lambda: False, exitcode=-15)
+        launches = []
+
+        def launch():
+            launches.append(True)
+            embedder.process = SimpleNamespace(is_alive=lambda: True, exitcode=None)
+
+        embedder._launch = launch
+        assert not embedder.check_health(now=100.0)
+        assert not embedder.check_health(now=100.5)
+        assert launches == []
+        assert embedder.check_health(now=101.0)
+        assert launches == [True] and embedder.snapshot()["restarts"] == 1
+
+    def test_evidence_clip_spans_trigger_and_dedups_frames(self, tmp_path):
+        """Test a violation clip holds pre/post frames and overlapping clips share blobs"""
+        from evidence import EvidenceRecorder, EvidenceStore
+
+        store = EvidenceStore(tmp_path)
+        recorder = EvidenceRecorder(None, store, sensor_id=1, pre_seconds=1.0, post_seconds=1.0, fps=2.0)
+        for i in range(5):
+            recorder.add(b"jpeg%d" % i, now=float(i))
+        assert recorder.snapshot()["buffered_frames"] == 2
+
+        first = recorder.trigger({"type": "OBJECT_DETECTED"}, now=4.5)
+        second = recorder.trigger({"type": "GAZE_DEVIATION"}, now=4.6)
+        recorder.add(b"jpeg5", now=5.0)
+        assert store.queue.empty()
+        recorder.add(b"jpeg6", now=6.0)
+        store.flush()
+
+        manifest = store.manifest(first)
+        assert manifest["event_type"] == "OBJECT_DETECTED"
+        assert [f["timestamp"] for f in manifest["frames"]] == [3.0, 4.0, 5.0, 6.0]
+        assert store.manifest(second)["frames"] == manifest["frames"]
+        assert len(list((tmp_path / "blobs").rglob("*.jpg"))) == 4
+
+    def test_evidence_clips_close_when_frames_stop(self, tmp_path):
+        """Test open clips are persisted on time after the camera stops publishing"""
+        import threading
+        import time
+        from types import SimpleNamespace
+        from evidence import EvidenceRecorder, EvidenceStore
+
+        def wait(after_seq, timeout=1.0):
+            # Camera lost: nothing new is ever published
+            time.sleep(min(timeout, 0.05))
+            return after_seq, None
+
+        store = EvidenceStore(tmp_path)
+        recorder = EvidenceRecorder(SimpleNamespace(wait=wait), store, sensor_id=1, post_seconds=0.1, max_open=1)
+        recorder.add(b"last frame")
+        stop = threading.Event()
+        thread = threading.Thread(target=recorder.run, args=(stop,), daemon=True)
+        thread.start()
+        try:
+            clip_id = recorder.trigger({"type": "GAZE_DEVIATION"})
+            assert recorder.trigger({"type": "GAZE_DEVIATION"}) is None
+            time.sleep(0.3)
+            assert recorder.snapshot()["open_clips"] == 0
+            assert recorder.trigger({"type": "OBJECT_DETECTED"}) is not None
+        finally:
+            stop.set()
+            thread.join()
+        store.flush()
+        assert len(store.manifest(clip_id)["frames"]) == 1
+
+    def test_rate_controller_scales_to_cpu_budget(self):
+        """Test detectors run at their own rates and slow down over budget"""
+        from scheduler import RateController
+
+        rates = RateController({"objects": 5.0, "gaze": 15.0}, cpu_budget=0.5)
+        assert rates.due("objects", now=1.0) and rates.due("gaze", now=1.0)
+        assert not rates.due("objects", now=1.1)
+        assert rates.due("gaze", now=1.1)
+
+        # 5 Hz * 0.1 s + 15 Hz * 0.02 s = 0.8 s/s of load against a 0.5 budget
+        rates.record("objects", 0.1)
+        rates.record("gaze", 0.02)
+        snap = rates.snapshot()["detectors"]
+        assert snap["objects"]["effective_hz"] == pytest.approx(5.0 * 0.5 / 0.8, abs=0.01)
+        assert snap["objects"]["skipped"] == 1
+
+    def test_debouncer_emits_start_and_end(self):
+        """Test a persisting object produces one start and one summarized end event"""
+        from debounce import EventDebouncer
+
+        phone = {"type": "OBJECT_DETECTED", "object": "cell phone"}
+        db = EventDebouncer(end_after=1.0)
+        emitted = []
+        for i, conf in enumerate([0.6, 0.9, 0.75]):
+            emitted += db.update([dict(phone, confidence=conf)], now=10.0 + i)
+        emitted += db.update([], now=12.5)
+        emitted += db.update([], now=13.5)
+
+        assert [e["type"] for e in emitted] == ["OBJECT_DETECTED", "OBJECT_DETECTED_END"]
+        end = emitted[1]
+        assert end["duration"] == 2.0
+        assert end["peak_confidence"] == 0.9
+        assert end["confidence"] == pytest.approx(0.75)
+
+    def test_iou_tracker_keeps_ids_and_predicts(self):
+        """Test tracks keep their id across keyframes and extrapolate between them"""
+        from tracking import IoUTracker
+
+        phone = {"type": "OBJECT_DETECTED", "object": "cell phone", "confidence": 0.8}
+        tracker = IoUTracker(max_age=1.0)
+        first = tracker.update([dict(phone, box=[0, 0, 10, 10])], now=0.0)
+        second = tracker.update([dict(phone, box=[2, 0, 12, 10])], now=0.2)
+        assert first[0]["track_id"] == second[0]["track_id"]
+
+        predicted = tracker.predict(now=0.3)
+        assert predicted[0]["box"][0] > 2
+        assert tracker.predict(now=2.0) == []
+
+    def test_model_cache_fails_fast_offline(self, tmp_path):
+        """Test missing models raise offline instead of triggering a download"""
+        from model_cache import resolve, ModelCacheError
+
+        (tmp_path / "yolov8n.pt").write_bytes(b"weights")
+        assert resolve("yolov8n.pt", tmp_path) == str(tmp_path / "yolov8n.pt")
+        with pytest.raises(ModelCacheError):
+            resolve("missing_model.task", tmp_path, offline=True)
+        assert resolve("missing_model.task", tmp_path, offline=False) == "missing_model.task"
+
 
 class TestAudioModuleIntegration:
     """Test audio module components"""
@@ -232,6 +599,46 @@ class TestAudioModuleIntegration:
         assert result_high["confidence"] == 0.6
 
 
+class TestEventClient:
+    """Test the shared AI module event client"""
+    
+    def test_spool_replays_in_order_and_resumes(self, tmp_path):
+        """Test spooled events survive a failed replay and are sent once drained"""
+        from event_client import Spool
+        
+        spool = Spool(str(tmp_path / "vision_events.spool"))
+        spool.append([{"n": i} for i in range(5)])
+        
+        sent = []
+        attempts = []
+        
+        def post(batch):
+            attempts.append(len(batch))
+            if len(attempts) == 2:
+                return False
+            sent.extend(batch)
+            return True
+        
+        assert spool.replay(post, batch_size=2) == 2
+        assert spool.pending()
+        assert spool.replay(post, batch_size=2) == 3
+        assert not spool.pending()
+        assert [e["n"] for e in sent] == [0, 1, 2, 3, 4]
+
+    def test_only_validation_errors_drop_batches(self, tmp_path):
+        """Test storage outages are retried while rejected payloads are dropped"""
+        from types import SimpleNamespace
+        from event_client import EventClient
+
+        client = EventClient(name="test", spool_path=str(tmp_path / "test.spool"))
+        client.close()
+        for status, delivered in ((200, True), (422, True), (400, True), (503, False), (500, False), (429, False)):
+            resp = SimpleNamespace(status_code=status, ok=status < 400, text="")
+            client.session = SimpleNamespace(post=lambda *args, **kwargs: resp)
+            assert client._post([{"n": 1}, {"n": 2}]) is delivered, status
+        assert client.stats["rejected"] == 4
+
+
 class TestRateLimiting:
     """Test rate limiting functionality"""
     
@@ -273,6 +680,49 @@ class TestRateLimiting:
         assert info["requests_used"] == 5
 
 
+class TestSupervisor:
+    """Test service supervision in start_system"""
+
+    def test_failed_dependency_is_restarted_and_dependent_started(self):
+        """Test a dependency that fails to start is retried and its dependent starts afterwards"""
+        import subprocess
+        import time
+        import start_system
+        from start_system import Service, Supervisor
+
+        attempts = []
+
+        def start_backend():
+            attempts.append(time.time())
+            if len(attempts) == 1:
+                raise subprocess.CalledProcessError(1, "init_schema")
+            if len(attempts) == 2:
+                return subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"])
+            return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+
+        def start_vision():
+            return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+
+        backend = Service("Backend", start_backend)
+        vision = Service("Vision", start_vision, depends_on=[backend])
+        supervisor = Supervisor([backend, vision], ready_timeout=0.5, backoff_base=0.05, watch_interval=0.05)
+        start_system.shutdown_event.clear()
+        try:
+            started = time.time()
+            supervisor.start_all()
+            assert time.time() - started < 5
+            deadline = time.time() + 10
+            while not (len(attempts) >= 3 and backend.ready.is_set() and vision.ready.is_set()):
+                assert time.time() < deadline, "services were not restarted"
+                time.sleep(0.05)
+            assert backend.process.poll() is None and vision.process.poll() is None
+        finally:
+            start_system.shutdown_event.set()
+            for svc in (backend, vision):
+                if svc.process is not None and svc.process.poll() is None:
+                    svc.process.kill()
+
+
 class TestErrorHandling:
     """Test error handling utilities"""
     